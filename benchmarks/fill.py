@@ -0,0 +1,84 @@
+'''
+Compares per-character typing with the fill strategy of the Type Tool over the fields of a fixture page.
+
+Run from the repository root:
+    python -m benchmarks.fill --runs 3
+'''
+from src.agent.web.browser.config import BrowserConfig
+from src.agent.web.context.config import ContextConfig
+from src.agent.web.context import Context
+from src.agent.web.browser import Browser
+from benchmarks.throughput import serve,percentile,ROOT
+from playwright.async_api import ElementHandle
+from statistics import median
+from time import perf_counter
+import argparse
+import asyncio
+
+ADDRESS='Flat 4B, The Old Mill, 221 Riverside Crescent, Upper Wolvercote, Oxford, Oxfordshire OX2 8PQ, United Kingdom. Ring twice, parcel box is behind the blue gate next to the garage.'
+
+FIELDS={
+    '#name':'Ada Lovelace',
+    '#email':'ada.lovelace@example.com',
+    '#address':ADDRESS,
+    '#notes':ADDRESS,
+    '#city':'Geneva',
+    '#otp':'493027',
+}
+
+async def type_keys(context:Context,handle:ElementHandle,text:str)->str:
+    '''The previous Type Tool: click, select all, delete and type every character.'''
+    page=await context.get_current_page()
+    await handle.click(force=True)
+    await page.keyboard.press('Control+A')
+    await page.keyboard.press('Backspace')
+    await page.keyboard.type(text,delay=80)
+    return 'type'
+
+async def fill(context:Context,handle:ElementHandle,text:str)->str:
+    return await context.fill_element(handle,text,clear=True)
+
+async def measure(context:Context,url:str,strategy,runs:int)->dict[str,list[float]]:
+    timings={selector:[] for selector in FIELDS}
+    page=await context.get_current_page()
+    for _ in range(runs):
+        await page.goto(url,wait_until='domcontentloaded')
+        for selector,text in FIELDS.items():
+            handle=await page.query_selector(selector)
+            start=perf_counter()
+            used=await strategy(context,handle,text)
+            timings[selector].append(perf_counter()-start)
+            value=await handle.evaluate('(element)=>element.isContentEditable?element.innerText:element.value')
+            if value.strip()!=text:
+                print(f'{selector}: value mismatch with {used}: {value!r}')
+    return timings
+
+def report(name:str,timings:dict[str,list[float]]):
+    print(f'\n{name}')
+    print(f'{"field":<12}{"chars":>8}{"median (s)":>12}{"p95 (s)":>12}')
+    for selector,samples in timings.items():
+        print(f'{selector:<12}{len(FIELDS[selector]):>8}{median(samples):>12.3f}{percentile(samples,0.95):>12.3f}')
+    total=[sum(samples) for samples in zip(*timings.values())]
+    print(f'{"all fields":<12}{"":>8}{median(total):>12.3f}{percentile(total,0.95):>12.3f}')
+
+async def main(args:argparse.Namespace):
+    server,base_url=serve(ROOT)
+    url=f'{base_url}/benchmarks/fixtures/inputs.html'
+    try:
+        browser=Browser(config=BrowserConfig(browser=args.browser,headless=not args.headed))
+        context=Context(browser=browser,config=ContextConfig())
+        try:
+            report('per-character typing',await measure(context,url,type_keys,args.runs))
+            report('fill strategy',await measure(context,url,fill,args.runs))
+        finally:
+            await context.close_session()
+            await browser.close_browser()
+    finally:
+        server.shutdown()
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description='Benchmark the fill strategy of the Type Tool against per-character typing.')
+    parser.add_argument('--browser',default='chromium',choices=['chromium','chrome','edge','firefox'])
+    parser.add_argument('--runs',type=int,default=3)
+    parser.add_argument('--headed',action='store_true')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,61 @@
+'''
+Measures the per-call overhead of the Registry: input validation and the tools prompt of every step,
+against the previous path that validated with `model_validate` + `model_dump` and rendered every prompt again.
+
+Run from the repository root:
+    python -m benchmarks.registry --calls 20000
+'''
+from src.agent.web.tools import click_tool,type_tool,scroll_tool,back_tool,form_tool,bulk_scrape_tool,scrape_tool,goto_tool
+from src.tool.registry import Registry
+from time import perf_counter
+from json import dumps
+import argparse
+
+TOOLS=[click_tool,type_tool,scroll_tool,back_tool,form_tool,bulk_scrape_tool,scrape_tool,goto_tool]
+
+CALLS=[
+    ('Click Tool',{'index':12}),
+    ('Type Tool',{'index':3,'text':'wireless headphones','clear':'True','press_enter':'True'}),
+    ('Scroll Tool',{'direction':'down','amount':600}),
+    ('Back Tool',{}),
+    ('Form Tool',{'fields':{'4':'Ada Lovelace','7':True,'9':['Red','Blue']}}),
+    ('Bulk Scrape Tool',{'urls':['https://example.com/a','https://example.com/b']}),
+    ('Scrape Tool',{'part':2}),
+    ('GoTo Tool',{'url':'https://example.com'}),
+]
+
+def validate_previous(registry:Registry,name:str,input:dict,**kwargs)->dict:
+    tool=registry.tools_registry.get(name)
+    return tool.params.model_validate(input).model_dump()|kwargs
+
+def prompt_previous(registry:Registry,excluded_tools:list[str]=[])->str:
+    return '\n\n'.join(f'Tool Name: {tool.name}\nTool Description: {tool.description}\nTool Input: {dumps(tool.schema,indent=2)}' for tool in registry.tools if tool.name not in excluded_tools)
+
+def per_call(function,calls:int)->float:
+    '''Microseconds per call over `calls` calls.'''
+    start=perf_counter()
+    for index in range(calls):
+        function(index)
+    return (perf_counter()-start)/calls*1e6
+
+def main(args:argparse.Namespace):
+    registry=Registry(TOOLS)
+    for name,input in CALLS:
+        # Both paths have to hand the tools exactly the same params
+        assert registry.validate(name,input,context=None)[1]==validate_previous(registry,name,input,context=None),name
+    assert registry.tools_prompt()==prompt_previous(registry)
+    rows=[
+        ('validate',lambda index:validate_previous(registry,*CALLS[index%len(CALLS)],context=None),lambda index:registry.validate(*CALLS[index%len(CALLS)],context=None)),
+        ('tools prompt',lambda index:prompt_previous(registry),lambda index:registry.tools_prompt()),
+    ]
+    for name,input in CALLS:
+        rows.append((f'  {name}',lambda index,name=name,input=input:validate_previous(registry,name,input,context=None),lambda index,name=name,input=input:registry.validate(name,input,context=None)))
+    print(f'{"":<20}{"previous":>12}{"compiled":>12}{"speedup":>10}')
+    for label,previous,compiled in rows:
+        previous_us,compiled_us=per_call(previous,args.calls),per_call(compiled,args.calls)
+        print(f'{label:<20}{previous_us:>10.2f}us{compiled_us:>10.2f}us{previous_us/compiled_us:>9.1f}x')
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description='Benchmark the per-call overhead of the tool registry.')
+    parser.add_argument('--calls',type=int,default=20000)
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+'''
+Compares page load plus observation latency between the default browser setup and the throughput preset.
+
+Run from the repository root:
+    python -m benchmarks.throughput --runs 5
+'''
+from src.agent.web.browser.config import BrowserConfig
+from src.agent.web.context.config import ContextConfig
+from http.server import ThreadingHTTPServer,SimpleHTTPRequestHandler
+from src.agent.web.tools import goto_tool
+from src.agent.web.context import Context
+from src.agent.web.browser import Browser
+from statistics import median
+from functools import partial
+from threading import Thread
+from time import perf_counter
+from pathlib import Path
+import argparse
+import asyncio
+
+ROOT=Path(__file__).resolve().parent.parent
+
+PAGES=[
+    'rl_train_site/train_page.html',
+    'rl_train_site/success.html',
+    'benchmarks/fixtures/heavy_feed.html',
+    'benchmarks/fixtures/heavy_animations.html',
+    'benchmarks/fixtures/heavy_iframes.html',
+]
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self,format,*args):
+        pass
+
+def serve(root:Path)->tuple[ThreadingHTTPServer,str]:
+    server=ThreadingHTTPServer(('127.0.0.1',0),partial(QuietHandler,directory=str(root)))
+    Thread(target=server.serve_forever,daemon=True).start()
+    host,port=server.server_address
+    return server,f'http://{host}:{port}'
+
+def percentile(samples:list[float],q:float)->float:
+    ordered=sorted(samples)
+    index=min(len(ordered)-1,max(0,round(q*(len(ordered)-1))))
+    return ordered[index]
+
+async def measure(browser_config:BrowserConfig,context_config:ContextConfig,base_url:str,runs:int)->dict[str,list[float]]:
+    browser=Browser(config=browser_config)
+    context=Context(browser=browser,config=context_config)
+    timings={page:[] for page in PAGES}
+    try:
+        for page in PAGES:
+            url=f'{base_url}/{page}'
+            for _ in range(runs):
+                start=perf_counter()
+                await goto_tool.func(url=url,context=context)
+                await context.get_state()
+                timings[page].append(perf_counter()-start)
+    finally:
+        await context.close_session()
+        await browser.close_browser()
+    return timings
+
+def report(name:str,timings:dict[str,list[float]]):
+    print(f'\n{name}')
+    print(f'{"page":<45}{"median (s)":>12}{"p95 (s)":>12}')
+    for page,samples in timings.items():
+        print(f'{page:<45}{median(samples):>12.3f}{percentile(samples,0.95):>12.3f}')
+    total=[sum(samples) for samples in zip(*timings.values())]
+    print(f'{"total per pass":<45}{median(total):>12.3f}{percentile(total,0.95):>12.3f}')
+
+async def main(args:argparse.Namespace):
+    server,base_url=serve(ROOT)
+    try:
+        headless=not args.headed
+        profiles={
+            'default':(BrowserConfig(browser=args.browser,headless=headless),ContextConfig()),
+            'throughput':(BrowserConfig.throughput(browser=args.browser,headless=headless),ContextConfig.throughput()),
+        }
+        for name,(browser_config,context_config) in profiles.items():
+            timings=await measure(browser_config,context_config,base_url,args.runs)
+            report(name,timings)
+    finally:
+        server.shutdown()
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description='Benchmark the throughput browser profile against the default one.')
+    parser.add_argument('--browser',default='chromium',choices=['chromium','chrome','edge','firefox'])
+    parser.add_argument('--runs',type=int,default=5)
+    parser.add_argument('--headed',action='store_true')
+    asyncio.run(main(parser.parse_args()))
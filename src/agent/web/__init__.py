@@ -1,12 +1,23 @@
-from src.agent.web.tools import click_tool,goto_tool,type_tool,scroll_tool,wait_tool,back_tool,key_tool,scrape_tool,tab_tool,forward_tool,done_tool,download_tool,human_tool,script_tool
+from src.agent.web.tools import click_tool,goto_tool,type_tool,scroll_tool,wait_tool,back_tool,key_tool,scrape_tool,tab_tool,forward_tool,done_tool,download_tool,human_tool,script_tool,fetch_tool,bulk_scrape_tool,scroll_until_tool,extract_tool,form_tool
 from src.message import SystemMessage,HumanMessage,ImageMessage,AIMessage
 from src.agent.web.utils import read_markdown_file,extract_agent_data
+from src.agent.web.checkpoint import sqlite_checkpointer
 from src.agent.web.browser import Browser,BrowserConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph,END,START
 from src.agent.web.state import AgentState
 from src.agent.web.context import Context
+from src.agent.web.context.config import ContextConfig
+from src.agent.web.replay import Replay
+from src.agent.web.watchdog import Watchdog,WatchdogError
+from src.agent.web.fleet import BrowserFleet
+from src.message import BaseMessage
+from src.trace import Tracer
 from src.inference import BaseInference
-from src.tool.registry import Registry
+from src.tool.registry import Registry,CLEANUP_TIMEOUT
+from src.tool.cache import ResultCache
+from src.tool.metrics import ToolMetrics
+from src.tool.registry.views import ToolResult
 from rich.markdown import Markdown
 from src.memory import BaseMemory
 from rich.console import Console
@@ -17,6 +28,7 @@ from termcolor import colored
 from textwrap import dedent
 from src.tool import Tool
 from pathlib import Path
+from uuid import uuid4
 import textwrap
 import platform
 import asyncio
@@ -26,13 +38,17 @@ main_tools=[
     click_tool,goto_tool,key_tool,scrape_tool,
     type_tool,scroll_tool,wait_tool,back_tool,
     tab_tool,done_tool,forward_tool,download_tool,
-    script_tool
+    script_tool,fetch_tool,bulk_scrape_tool,
+    scroll_until_tool,extract_tool,form_tool
 ]
 
 class Agent(BaseAgent):
     def __init__(self,config:BrowserConfig=None,additional_tools:list[Tool]=[],
     instructions:list=[],memory:BaseMemory=None,llm:BaseInference=None,max_iteration:int=10,
-    use_vision:bool=False,include_human_in_loop:bool=False,verbose:bool=False,token_usage:bool=False) -> None:
+    use_vision:bool=False,include_human_in_loop:bool=False,verbose:bool=False,token_usage:bool=False,
+    checkpoint_path:str=None,replay:Replay=None,tracer:Tracer=None,context_config:ContextConfig=None,
+    fleet:BrowserFleet=None,watchdog:Watchdog=None,cache:ResultCache=None,tool_timeout:float=None,
+    metrics:ToolMetrics=None) -> None:
         """
         Initializes the WebAgent object.
 
@@ -47,6 +63,15 @@ class Agent(BaseAgent):
             include_human_in_loop (bool, optional): Whether to include human in the loop or not. Defaults to False.
             verbose (bool, optional): Whether to print verbose output or not. Defaults to False.
             token_usage (bool, optional): Whether to track token usage or not. Defaults to False.
+            checkpoint_path (str, optional): SQLite file to checkpoint the agent state after each node, enables resuming runs by run id. Defaults to None.
+            replay (Replay, optional): Trajectory replay cache, replays recorded actions of successful runs without calling the LLM. Defaults to None.
+            tracer (Tracer, optional): Emits timing spans for every graph node and browser phase to its sink. Defaults to None.
+            context_config (ContextConfig, optional): Browser context configuration, e.g. the network filter profile. Defaults to None.
+            fleet (BrowserFleet, optional): Shared browser fleet, each run takes a context from the least loaded browser instead of launching its own. Defaults to None.
+            watchdog (Watchdog, optional): Puts deadlines on actions and observations and recovers crashed or hung pages and browsers instead of failing the run. Defaults to None.
+            cache (ResultCache, optional): Reuses the results of cacheable tools (e.g. Bulk Scrape Tool, Download Tool) for identical calls, across runs through its on-disk store. Defaults to None.
+            tool_timeout (float, optional): Seconds any tool without a deadline of its own may run before it is cancelled and reported as timed out. Defaults to None.
+            metrics (ToolMetrics, optional): Collects calls, errors, durations and result sizes per tool and hands them to its exporters at the end of every run. Defaults to None.
 
         Returns:
             None
@@ -58,10 +83,23 @@ class Agent(BaseAgent):
         self.action_prompt=read_markdown_file('./src/agent/web/prompt/action.md')
         self.answer_prompt=read_markdown_file('./src/agent/web/prompt/answer.md')
         self.instructions=self.format_instructions(instructions)
-        self.registry=Registry(main_tools+additional_tools+([human_tool] if include_human_in_loop else []))
+        self.cache=cache
+        self.metrics=metrics
+        self.registry=Registry(main_tools+additional_tools+([human_tool] if include_human_in_loop else []),cache=cache,default_timeout=tool_timeout,metrics=metrics)
         self.include_human_in_loop=include_human_in_loop
-        self.browser=Browser(config=config)
-        self.context=Context(browser=self.browser)
+        self.tracer=tracer or Tracer()
+        self.context_config=context_config or ContextConfig()
+        self.fleet=fleet
+        self.watchdog=watchdog
+        if fleet is None:
+            self.browser=Browser(config=config)
+            self.context=Context(browser=self.browser,config=self.context_config,tracer=self.tracer)
+            self.network_stats=self.context.network_stats
+        else:
+            # Acquired from the fleet when a run starts
+            self.browser=None
+            self.context=None
+            self.network_stats=None
         self.max_iteration=max_iteration
         self.token_usage=token_usage
         self.structured_output=None
@@ -69,30 +107,58 @@ class Agent(BaseAgent):
         self.verbose=verbose
         self.start_time=None
         self.memory=memory
+        self.replay=replay
         self.end_time=None
         self.iteration=0
+        self.checkpoint_path=checkpoint_path
+        self.run_id=None
         self.llm=llm
         self.graph=self.create_graph()
 
     def format_instructions(self,instructions):
         return '\n'.join([f'{i+1}. {instruction}' for (i,instruction) in enumerate(instructions)])
 
+    def payload_size(self,message:BaseMessage)->int:
+        contents=message.content if isinstance(message.content,tuple) else (message.content,)
+        return sum(len(content.encode()) for content in contents if isinstance(content,str))
+
+    def traced(self,name:str,node):
+        "Wrap a graph node in a span tagged with the current step"
+        async def traced_node(state:AgentState):
+            with self.tracer.span(name,step=self.iteration):
+                return await node(state)
+        return traced_node
+
     async def reason(self,state:AgentState):
         "Call LLM to make decision based on the current state of the browser"
-        system_prompt=self.system_prompt.format(**{
-            'os':platform.system(),
-            'instructions':self.instructions,
-            'home_dir':Path.home().as_posix(),
-            'max_iteration':self.max_iteration,
-            'human_in_loop':self.include_human_in_loop,
-            'tools_prompt':self.registry.tools_prompt(),
-            'browser':self.browser.config.browser.capitalize(),
-            'downloads_dir':self.browser.config.downloads_dir,
-            'current_datetime':datetime.now().strftime('%A, %B %d, %Y')
-        })
-        messages=[SystemMessage(system_prompt)]+state.get('messages')
-        ai_message=await self.llm.async_invoke(messages=messages)
-        agent_data=extract_agent_data(ai_message.content)
+        # Replay the recorded decision while the page matches the recorded trajectory
+        agent_data=self.replay.next_step(self.replay.fingerprint(state.get('browser_state'))) if self.replay else None
+        if agent_data is None:
+            system_prompt=self.system_prompt.format(**{
+                'os':platform.system(),
+                'instructions':self.instructions,
+                'home_dir':Path.home().as_posix(),
+                'max_iteration':self.max_iteration,
+                'human_in_loop':self.include_human_in_loop,
+                'tools_prompt':self.registry.tools_prompt(),
+                'browser':self.browser.config.browser.capitalize(),
+                'downloads_dir':self.browser.config.downloads_dir,
+                'current_datetime':datetime.now().strftime('%A, %B %d, %Y')
+            })
+            messages=[SystemMessage(system_prompt)]+state.get('messages')
+            with self.tracer.span('llm',model=self.llm.model) as span:
+                if self.tracer.enabled:
+                    span.attributes['request_bytes']=sum(map(self.payload_size,messages))
+                    input_tokens,output_tokens=self.llm.tokens.input or 0,self.llm.tokens.output or 0
+                ai_message=await self.llm.async_invoke(messages=messages)
+                if self.tracer.enabled:
+                    span.attributes['response_bytes']=self.payload_size(ai_message)
+                    span.attributes['input_tokens']=(self.llm.tokens.input or 0)-input_tokens
+                    span.attributes['output_tokens']=(self.llm.tokens.output or 0)-output_tokens
+            with self.tracer.span('parse'):
+                agent_data=extract_agent_data(ai_message.content)
+        elif self.verbose:
+            print(colored('Replaying recorded step',color='light_cyan',attrs=['bold']))
         memory=agent_data.get('Memory')
         evaluate=agent_data.get("Evaluate")
         thought=agent_data.get('Thought')
@@ -125,38 +191,66 @@ class Agent(BaseAgent):
         action_input:dict=agent_data.get('Action Input')
         if self.verbose:
             print(colored(f'Action: {action_name}({','.join([f'{k}={v}' for k,v in action_input.items()])})',color='blue',attrs=['bold']))
-        action_result=await self.registry.async_execute(action_name,action_input,context=self.context)
-        observation=action_result.content
+        fingerprint=self.replay.fingerprint(state.get('browser_state')) if self.replay else None
+        with self.tracer.span('tool',tool=action_name) as span:
+            action_result=await self.execute_action(action_name,action_input)
+            observation=action_result.content
+            span.attributes['result_bytes']=len(observation.encode())
+        if self.replay and action_result.status=='success':
+            self.replay.record(fingerprint,agent_data)
         if self.verbose:
             print(colored(f'Observation: {textwrap.shorten(observation,width=1000,placeholder='...')}',color='green',attrs=['bold']))
         if self.verbose and self.token_usage:
             print(f'Input Tokens: {self.llm.tokens.input} Output Tokens: {self.llm.tokens.output} Total Tokens: {self.llm.tokens.total}')
         # Get the current screenshot,browser state and dom state
-        browser_state=await self.context.get_state(use_vision=self.use_vision)
+        tool=self.registry.tools_registry.get(action_name)
+        with self.tracer.span('observe'):
+            # A tool that leaves the page alone has nothing to wait for
+            browser_state=await self.observe(settle=tool is not None and tool.mutates_page)
         current_tab=browser_state.current_tab
         dom_state=browser_state.dom_state
         image_obj=browser_state.screenshot
-        # Redefining the AIMessage and adding the new observation
-        action_prompt=self.action_prompt.format(**{
-            'memory':memory,
-            'evaluate':evaluate,
-            'thought':thought,
-            'action_name':action_name,
-            'action_input':json.dumps(action_input,indent=2)
-        })
-        observation_prompt=self.observation_prompt.format(**{
-            'iteration':self.iteration,
-            'max_iteration':self.max_iteration,
-            'observation':observation,
-            'current_tab':current_tab.to_string(),
-            'tabs':browser_state.tabs_to_string(),
-            'interactive_elements':dom_state.interactive_elements_to_string(),
-            'informative_elements':dom_state.informative_elements_to_string(),
-            'scrollable_elements':dom_state.scrollable_elements_to_string(),
-            'query':state.get('input')
-        })
+        with self.tracer.span('prompt') as span:
+            # Redefining the AIMessage and adding the new observation
+            action_prompt=self.action_prompt.format(**{
+                'memory':memory,
+                'evaluate':evaluate,
+                'thought':thought,
+                'action_name':action_name,
+                'action_input':json.dumps(action_input,indent=2)
+            })
+            observation_prompt=self.observation_prompt.format(**{
+                'iteration':self.iteration,
+                'max_iteration':self.max_iteration,
+                'observation':observation,
+                'current_tab':current_tab.to_string(),
+                'tabs':browser_state.tabs_to_string(),
+                'interactive_elements':dom_state.interactive_elements_to_string(),
+                'informative_elements':dom_state.informative_elements_to_string(),
+                'scrollable_elements':dom_state.scrollable_elements_to_string(),
+                'query':state.get('input')
+            })
+            span.attributes['observation_bytes']=len(observation_prompt.encode())
         messages=[AIMessage(action_prompt),ImageMessage(text=observation_prompt,image_obj=image_obj) if self.use_vision and image_obj is not None else HumanMessage(observation_prompt)]
-        return {**state,'messages':messages,'browser_state':browser_state,'dom_state':dom_state,'prev_observation':observation}
+        return {**state,'iteration':self.iteration,'messages':messages,'browser_state':browser_state,'dom_state':dom_state,'prev_observation':observation}
+
+    async def execute_action(self,action_name:str,action_input:dict)->ToolResult:
+        if self.watchdog is None:
+            return await self.registry.async_execute(action_name,action_input,context=self.context)
+        tool=self.registry.tools_registry.get(action_name)
+        deadline=self.registry.deadline(tool) if tool else None
+        # A tool with a longer deadline of its own (e.g. a download) is bounded by the registry, not cut short here
+        timeout=max(self.watchdog.action_timeout,deadline+2*CLEANUP_TIMEOUT) if deadline else self.watchdog.action_timeout
+        try:
+            return await self.watchdog.guard(self.context,action_name,lambda:self.registry.async_execute(action_name,action_input,context=self.context),timeout=timeout)
+        except WatchdogError as e:
+            # The page was recovered, report the failed action so the LLM retries or picks another
+            return ToolResult(name=action_name,content=f"Error executing tool '{action_name}': {e}",status='error')
+
+    async def observe(self,settle:bool=True):
+        if self.watchdog is None:
+            return await self.context.get_state(use_vision=self.use_vision,settle=settle)
+        return await self.watchdog.guard(self.context,'Observation',lambda:self.context.get_state(use_vision=self.use_vision,settle=settle),timeout=self.watchdog.observe_timeout,retries=1)
 
     async def answer(self,state:AgentState):
         "Give the final answer"
@@ -169,6 +263,8 @@ class Agent(BaseAgent):
             action_input=agent_data.get('Action Input')
             action_result=await self.registry.async_execute(action_name,action_input,context=None)
             final_answer=action_result.content
+            if self.replay:
+                self.replay.save()
         else:
             evaluate='I have reached the maximum iteration limit.'
             memory='I have reached the maximum iteration limit. Cannot procced further.'
@@ -185,7 +281,6 @@ class Agent(BaseAgent):
         message=AIMessage(answer_prompt)
         if self.verbose:
             print(colored(f'Final Answer: {final_answer}',color='cyan',attrs=['bold']))
-        await self.close()
         return {**state,'browser_state':None,'dom_state':None,'output':final_answer,'messages':[message],'prev_observation':'','agent_data':{}}
 
     def main_controller(self,state:AgentState):
@@ -198,21 +293,34 @@ class Agent(BaseAgent):
                 return 'action'
         return 'answer'
 
-    def create_graph(self):
+    def create_graph(self,checkpointer:BaseCheckpointSaver=None):
         "Create the graph"
         graph=StateGraph(AgentState)
-        graph.add_node('reason',self.reason)
-        graph.add_node('action',self.action)
-        graph.add_node('answer',self.answer)
+        graph.add_node('reason',self.traced('reason',self.reason))
+        graph.add_node('action',self.traced('action',self.action))
+        graph.add_node('answer',self.traced('answer',self.answer))
 
         graph.add_edge(START,'reason')
         graph.add_conditional_edges('reason',self.main_controller)
         graph.add_edge('action','reason')
         graph.add_edge('answer',END)
 
-        return graph.compile(debug=False)
+        return graph.compile(checkpointer=checkpointer,debug=False)
     
-    async def async_invoke(self, input: str)->dict|BaseModel:
+    async def acquire_context(self):
+        if self.fleet is None or self.context is not None:
+            return None
+        self.context=await self.fleet.acquire_context(config=self.context_config,tracer=self.tracer)
+        self.browser=self.context.browser
+        self.network_stats=self.context.network_stats
+
+    def graph_config(self,run_id:str=None)->dict:
+        config={'recursion_limit':self.max_iteration}
+        if run_id is not None:
+            config['configurable']={'thread_id':run_id}
+        return config
+
+    async def async_invoke(self, input: str, run_id: str=None)->dict|BaseModel:
         self.iteration=0
         observation_prompt=self.observation_prompt.format(**{
             'iteration':self.iteration,
@@ -231,6 +339,7 @@ class Agent(BaseAgent):
         })
         state={
             'input':input,
+            'iteration':0,
             'agent_data':{},
             'prev_observation':'No Observation',
             'browser_state':None,
@@ -238,19 +347,41 @@ class Agent(BaseAgent):
             'output':'',
             'messages':[HumanMessage(observation_prompt)]
         }
+        if self.replay:
+            self.replay.start(input)
+        await self.acquire_context()
         self.start_time=datetime.now()
-        response=await self.graph.ainvoke(state,config={'recursion_limit':self.max_iteration})
+        with self.tracer.span('run',max_iteration=self.max_iteration) as span:
+            if self.checkpoint_path is None:
+                response=await self.graph.ainvoke(state,config=self.graph_config())
+            else:
+                self.run_id=run_id or str(uuid4())
+                span.attributes['run_id']=self.run_id
+                async with sqlite_checkpointer(self.checkpoint_path) as checkpointer:
+                    graph=self.create_graph(checkpointer=checkpointer)
+                    response=await graph.ainvoke(state,config=self.graph_config(self.run_id))
+            span.attributes['steps']=self.iteration
         self.end_time=datetime.now()
         total_seconds=(self.end_time-self.start_time).total_seconds()
         if self.verbose and self.token_usage:
             print(f'Input Tokens: {self.llm.tokens.input} Output Tokens: {self.llm.tokens.output} Total Tokens: {self.llm.tokens.total}')
             print(f'Total Time Taken: {total_seconds} seconds Number of Steps: {self.iteration}')
+            if self.network_stats and self.network_stats.blocked_requests:
+                print(f'Network Filter: {self.network_stats.to_string()}')
+            if self.cache:
+                print(f'Tool Cache: {self.cache.stats.to_string()}')
+            if self.metrics:
+                print(f'Tool Metrics:\n{self.metrics.to_string()}')
+        if self.metrics:
+            self.metrics.export()
+        # Closed once the run span is exported, not from the answer node that still runs inside it
+        await self.close()
         # Extract and store the key takeaways of the task performed by the agent
         if self.memory:
             self.memory.store(response.get('messages'))
         return response
         
-    def invoke(self, input: str)->dict|BaseModel:
+    def invoke(self, input: str, run_id: str=None)->dict|BaseModel:
         if self.verbose:
             print('Entering '+colored(self.name,'black','on_white'))
         try:
@@ -258,9 +389,51 @@ class Agent(BaseAgent):
         except RuntimeError:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-        response = loop.run_until_complete(self.async_invoke(input=input))
+        response = loop.run_until_complete(self.async_invoke(input=input,run_id=run_id))
         return response
     
+    async def async_resume(self, run_id: str)->dict|BaseModel:
+        '''Continue a checkpointed run from the last completed node, reopening its tabs in a fresh browser.'''
+        if self.checkpoint_path is None:
+            raise ValueError('Resuming a run requires the agent to be created with a checkpoint_path.')
+        self.run_id=run_id
+        self.start_time=datetime.now()
+        async with sqlite_checkpointer(self.checkpoint_path) as checkpointer:
+            graph=self.create_graph(checkpointer=checkpointer)
+            config=self.graph_config(run_id)
+            snapshot=await graph.aget_state(config)
+            if not snapshot.values:
+                raise ValueError(f'No checkpoint found for run {run_id}')
+            if not snapshot.next:
+                return snapshot.values
+            # main_controller already counted the step when the run stopped in front of action/answer
+            iteration=snapshot.values.get('iteration',0)
+            self.iteration=iteration if 'reason' in snapshot.next else min(iteration+1,self.max_iteration)
+            browser_state=snapshot.values.get('browser_state')
+            await self.acquire_context()
+            if browser_state is not None:
+                await self.context.restore_state(browser_state,use_vision=self.use_vision)
+            with self.tracer.span('run',max_iteration=self.max_iteration,run_id=run_id,resumed=True) as span:
+                response=await graph.ainvoke(None,config=config)
+                span.attributes['steps']=self.iteration
+        self.end_time=datetime.now()
+        if self.verbose and self.token_usage:
+            total_seconds=(self.end_time-self.start_time).total_seconds()
+            print(f'Total Time Taken: {total_seconds} seconds Number of Steps: {self.iteration}')
+        await self.close()
+        if self.memory:
+            self.memory.store(response.get('messages'))
+        return response
+
+    def resume(self, run_id: str)->dict|BaseModel:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+        response = loop.run_until_complete(self.async_resume(run_id=run_id))
+        return response
+
     async def invoke_history(self, input: str)->dict|BaseModel:
         pass
     
@@ -272,13 +445,20 @@ class Agent(BaseAgent):
     async def close(self):
         '''Close the browser and context followed by clean up'''
         try:
-            await self.context.close_session()
-            await self.browser.close_browser()
+            if self.fleet is not None:
+                # The browser belongs to the fleet, only hand the context back
+                await self.fleet.release_context(self.context)
+            else:
+                await self.context.close_session()
+                await self.browser.close_browser()
         except Exception:
             print('Failed to finish clean up')
         finally:
             self.context=None
             self.browser=None
+            self.tracer.close()
+            if self.metrics:
+                self.metrics.close()
 
     def stream(self, input:str):
         pass
@@ -1,11 +1,21 @@
 from src.agent.web.browser.config import BrowserConfig,BROWSER_ARGS,SECURITY_ARGS,IGNORE_DEFAULT_ARGS
 from playwright.async_api import async_playwright,Browser as PlaywrightBrowser,Playwright
+import asyncio
+import socket
+
+def get_free_port()->int:
+    '''Ask the OS for an unused TCP port.'''
+    with socket.socket(socket.AF_INET,socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1',0))
+        return sock.getsockname()[1]
 
 class Browser:
     def __init__(self,config:BrowserConfig=None):
         self.playwright:Playwright = None
         self.config = config if config else BrowserConfig()
         self.playwright_browser:PlaywrightBrowser = None
+        self.debugging_port:int = None
+        self.lock = asyncio.Lock()
 
     async def __aenter__(self):
         await self.init_browser()
@@ -23,17 +33,27 @@ class Browser:
             await self.init_browser()
         return self.playwright_browser
 
+    async def relaunch(self):
+        '''Replace a crashed or disconnected browser process, a no-op when another caller already did.'''
+        async with self.lock:
+            if self.playwright_browser is not None and self.playwright_browser.is_connected():
+                return None
+            await self.close_browser()
+            await self.init_browser()
+
     async def setup_browser(self,browser:str)->PlaywrightBrowser:
+        # A unique port per instance, a fixed one collides with any other browser on the host
+        self.debugging_port=self.config.remote_debugging_port or get_free_port()
         parameters={
             'headless':self.config.headless,
             'downloads_path':self.config.downloads_dir,
             'timeout':self.config.timeout,
             'slow_mo':self.config.slow_mo,
-            'args':BROWSER_ARGS + SECURITY_ARGS,
+            'args':BROWSER_ARGS + SECURITY_ARGS + [f'--remote-debugging-port={self.debugging_port}'] + self.config.args,
             'ignore_default_args': IGNORE_DEFAULT_ARGS
         }
         if self.config.wss_url is not None:
-            if browser=='chrome':
+            if browser in ('chrome','chromium'):
                 browser_instance=await self.playwright.chromium.connect(self.config.wss_url)
             elif browser=='firefox':
                 browser_instance=await self.playwright.firefox.connect(self.config.wss_url)
@@ -53,6 +73,8 @@ class Browser:
                 browser_instance=await self.playwright.firefox.launch(**parameters)
             elif browser=='edge':
                 browser_instance=await self.playwright.chromium.launch(channel='msedge',**parameters)
+            elif browser=='chromium':
+                browser_instance=await self.playwright.chromium.launch(**parameters)
             else:
                 raise Exception('Invalid Browser Type')
         return browser_instance
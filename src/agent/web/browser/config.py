@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass,field
 from typing import Literal
 from pathlib import Path
 
@@ -9,10 +9,17 @@ class BrowserConfig:
     device:str=None
     browser_instance_dir:str=None
     downloads_dir:str=(Path.home()/'Downloads').as_posix()
-    browser:Literal['chrome','firefox','edge']='edge'
+    browser:Literal['chrome','firefox','edge','chromium']='edge'
     user_data_dir:str=None
     timeout:int=60*1000
     slow_mo:int=300
+    remote_debugging_port:int=None
+    args:list[str]=field(default_factory=list)
+
+    @classmethod
+    def throughput(cls,**kwargs)->'BrowserConfig':
+        '''Preset for unattended runs: headless, no slow motion and Chromium flags that cut GPU and compositor work.'''
+        return cls(**({'headless':True,'slow_mo':0,'args':list(THROUGHPUT_ARGS)}|kwargs))
 
 SECURITY_ARGS = [
 	'--disable-web-security',
@@ -35,7 +42,21 @@ BROWSER_ARGS=[
 	'--no-default-browser-check',
 	'--no-startup-window',
 	'--window-position=0,0',
-    '--remote-debugging-port=9222'
 ]
 
-IGNORE_DEFAULT_ARGS=['--enable-automation']
\ No newline at end of file
+IGNORE_DEFAULT_ARGS=['--enable-automation']
+
+THROUGHPUT_ARGS=[
+	'--disable-gpu',
+	'--disable-gpu-compositing',
+	'--disable-threaded-animation',
+	'--disable-threaded-scrolling',
+	'--disable-smooth-scrolling',
+	'--disable-checker-imaging',
+	'--disable-extensions',
+	'--disable-background-networking',
+	'--disable-component-update',
+	'--disable-default-apps',
+	'--disable-dev-shm-usage',
+	'--mute-audio',
+]
@@ -0,0 +1,79 @@
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from src.message import BaseMessage,HumanMessage,AIMessage,SystemMessage,ImageMessage,ToolMessage
+from src.agent.web.context.views import BrowserState,Tab
+from src.agent.web.dom.views import DOMState
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+import aiosqlite
+
+MESSAGE_TYPES={message.__name__:message for message in [HumanMessage,AIMessage,SystemMessage,ImageMessage,ToolMessage]}
+
+class AgentStateSerializer(JsonPlusSerializer):
+    '''
+    Serializes the agent state for the checkpointer.
+
+    Messages are stored as plain fields and the browser state is reduced to its tab set (id, url and title),
+    so the Playwright pages, the screenshot and the DOM state never reach the store. They are rebuilt by
+    `Context.restore_state` when a run is resumed.
+    '''
+    def dumps_typed(self,obj:Any)->tuple[str,bytes]:
+        return super().dumps_typed(self.encode(obj))
+
+    def loads_typed(self,data:tuple[str,bytes])->Any:
+        return self.decode(super().loads_typed(data))
+
+    def encode(self,obj:Any)->Any:
+        if isinstance(obj,BaseMessage):
+            return {'__message__':obj.__class__.__name__,'fields':self.encode(obj.__dict__)}
+        elif isinstance(obj,BrowserState):
+            current_tab=self.encode_tab(obj.current_tab) if obj.current_tab else None
+            return {'__browser_state__':True,'current_tab':current_tab,'tabs':[self.encode_tab(tab) for tab in obj.tabs]}
+        elif isinstance(obj,DOMState):
+            return None
+        elif type(obj) is dict:
+            return {key:self.encode(value) for key,value in obj.items()}
+        elif type(obj) in (list,tuple):
+            return type(obj)(self.encode(value) for value in obj)
+        return obj
+
+    def decode(self,obj:Any)->Any:
+        if type(obj) is dict:
+            if '__message__' in obj:
+                return self.decode_message(obj)
+            elif '__browser_state__' in obj:
+                current_tab=self.decode_tab(obj.get('current_tab')) if obj.get('current_tab') else None
+                tabs=[self.decode_tab(tab) for tab in obj.get('tabs')]
+                return BrowserState(current_tab=current_tab,tabs=tabs,screenshot=None,dom_state=DOMState())
+            return {key:self.decode(value) for key,value in obj.items()}
+        elif type(obj) in (list,tuple):
+            return type(obj)(self.decode(value) for value in obj)
+        return obj
+
+    def encode_tab(self,tab:Tab)->dict:
+        return {'id':tab.id,'url':tab.url,'title':tab.title}
+
+    def decode_tab(self,tab:dict)->Tab:
+        return Tab(id=tab.get('id'),url=tab.get('url'),title=tab.get('title'),page=None)
+
+    def decode_message(self,obj:dict)->BaseMessage:
+        message_type=MESSAGE_TYPES.get(obj.get('__message__'))
+        if message_type is None:
+            raise ValueError(f'Unknown message type {obj.get('__message__')} in checkpoint')
+        fields=self.decode(obj.get('fields'))
+        if message_type is ImageMessage:
+            # msgpack has no tuple type, ImageMessage expects (text,image)
+            fields['content']=tuple(fields.get('content'))
+        message=message_type.__new__(message_type)
+        message.__dict__.update(fields)
+        return message
+
+@asynccontextmanager
+async def sqlite_checkpointer(path:str):
+    '''Open an `AsyncSqliteSaver` on the given database file, creating the parent folder if needed.'''
+    Path(path).parent.mkdir(parents=True,exist_ok=True)
+    async with aiosqlite.connect(path) as conn:
+        checkpointer=AsyncSqliteSaver(conn,serde=AgentStateSerializer())
+        await checkpointer.setup()
+        yield checkpointer
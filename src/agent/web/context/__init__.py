@@ -1,23 +1,46 @@
-from playwright.async_api import Page,Browser as PlaywrightBrowser,Frame,ElementHandle,BrowserContext as PlaywrightContext
-from src.agent.web.context.config import IGNORED_URL_PATTERNS,RELEVANT_FILE_EXTENSIONS,RELEVANT_CONTEXT_TYPES
+from playwright.async_api import Page,Browser as PlaywrightBrowser,Frame,ElementHandle,JSHandle,BrowserContext as PlaywrightContext,Request,Response,Route
+from src.agent.web.context.config import IGNORED_URL_PATTERNS,RELEVANT_FILE_EXTENSIONS,RELEVANT_CONTEXT_TYPES,NETWORK_IDLE_RESOURCE_TYPES,BLOCKED_HOSTS
 from src.agent.web.browser.config import BROWSER_ARGS,SECURITY_ARGS,IGNORE_DEFAULT_ARGS
-from src.agent.web.context.views import BrowserSession,BrowserState,Tab
-from src.agent.web.context.config import ContextConfig
+from src.agent.web.context.views import BrowserSession,BrowserState,Tab,NetworkActivity,NetworkStats
+from src.agent.web.context.config import ContextConfig,NetworkProfile
 from src.agent.web.dom.views import DOMElementNode
 from src.agent.web.browser import Browser
+from src.agent.web.storage import StorageStateCache
 from src.agent.web.dom import DOM
+from src.trace import Tracer
 from urllib.parse import urlparse
+from time import monotonic
+from typing import Literal
+import asyncio
+from dataclasses import replace
+from functools import cache
 from datetime import datetime
 from pathlib import Path
 from uuid import uuid4
 from os import getcwd
 
+SCRIPTS_DIR='./src/agent/web/context/scripts'
+
+@cache
+def load_script(name:str)->str:
+    '''Source of a page script of the scripts folder, read once per process.'''
+    with open(f'{SCRIPTS_DIR}/{name}.js') as f:
+        return f.read().strip()
+
 class Context:
-    def __init__(self,browser:Browser,config:ContextConfig=ContextConfig()):
+    def __init__(self,browser:Browser,config:ContextConfig=ContextConfig(),tracer:Tracer=None):
         self.browser=browser
         self.config=config
+        self.tracer=tracer or Tracer()
         self.context_id=str(uuid4())
         self.session:BrowserSession=None
+        self.storage=StorageStateCache(config.storage_state_dir) if config.storage_state_dir and config.storage_state_key else None
+        self.network_activity:dict[Page,NetworkActivity]={}
+        self.tab_registry:dict[Page,Tab]={}
+        self.background_tasks:set[asyncio.Task]=set()
+        self.network_stats=NetworkStats()
+        # Outcome of the last click per page, lets the next observation of that page skip the settle wait when nothing changed
+        self.expected_changes:dict[Page,Literal['navigation','popup','mutation','none']]={}
 
     async def __aenter__(self):
         await self.init_session()
@@ -29,16 +52,27 @@ class Context:
     async def close_session(self):
         if self.session is None:
             return None
+        context=self.session.context
+        try:
+            await self.save_storage_state()
+        except Exception as e:
+            print('Storage state failed to save',e)
+        # Forgotten before the close, so the close event is not taken for a lost browser
+        self.session=None
+        self.tab_registry.clear()
+        self.network_activity.clear()
+        self.expected_changes.clear()
         try:
-            await self.session.context.close()
+            await context.close()
         except Exception as e:
             print('Context failed to close',e)
-        finally:
-            self.browser_context=None
 
     async def init_session(self):
         browser=await self.browser.get_playwright_browser()
         context=await self.setup_context(browser)
+        for existing_page in context.pages:
+            self.on_page(existing_page)
+        context.on('page',self.on_page)
         if browser is not None: # The case whether is no user_data provided
             page=await context.new_page()
         else: # The case where the user_data is provided
@@ -48,7 +82,9 @@ class Context:
             else:
                 page=await context.new_page()
         state=await self.initial_state(page)
-        self.session=BrowserSession(context,page,state)
+        session=BrowserSession(context,page,state)
+        context.on('close',lambda _:setattr(session,'closed',True))
+        self.session=session
         
     async def initial_state(self,page:Page):
         screenshot,dom_state=None,[]
@@ -57,24 +93,86 @@ class Context:
         state=BrowserState(current_tab=current_tab,tabs=tabs,screenshot=screenshot,dom_state=dom_state)
         return state
     
-    async def update_state(self,use_vision:bool=False):
+    async def update_state(self,use_vision:bool=False,settle:bool=True):
         dom=DOM(self)
-        screenshot,dom_state=await dom.get_state(use_vision=use_vision)
-        tabs=await self.get_all_tabs()
-        current_tab=await self.get_current_tab()
+        screenshot,dom_state=await dom.get_state(use_vision=use_vision,settle=settle)
+        with self.tracer.span('tabs') as span:
+            tabs=await self.get_all_tabs()
+            current_tab=await self.get_current_tab()
+            span.attributes['count']=len(tabs)
         state=BrowserState(current_tab=current_tab,tabs=tabs,screenshot=screenshot,dom_state=dom_state)
         return state
     
-    async def get_state(self,use_vision=False)->BrowserState:
+    async def get_state(self,use_vision=False,settle:bool=True)->BrowserState:
+        '''Observe the current page, `settle=False` skips the wait for a stable page when nothing could have changed it.'''
         session=await self.get_session()
-        state=await self.update_state(use_vision=use_vision)
+        state=await self.update_state(use_vision=use_vision,settle=settle)
         session.state=state
         return session.state
     
+    async def restore_state(self,state:BrowserState,use_vision:bool=False)->BrowserState:
+        '''Reopen the tabs of a checkpointed browser state and rebuild the DOM state of the current tab.'''
+        session=await self.get_session()
+        tabs=state.tabs or ([state.current_tab] if state.current_tab else [])
+        pages=[session.current_page]
+        for _ in tabs[1:]:
+            pages.append(await session.context.new_page())
+        for page,tab in zip(pages,tabs):
+            if not tab.url or tab.url=='about:blank':
+                continue
+            try:
+                await page.goto(url=tab.url,wait_until='domcontentloaded')
+            except Exception as e:
+                print(f'Tab failed to restore: {tab.url}\nError: {e}')
+        current_id=state.current_tab.id if state.current_tab else 0
+        session.current_page=pages[current_id] if 0<=current_id<len(pages) else pages[0]
+        await session.current_page.bring_to_front()
+        return await self.get_state(use_vision=use_vision)
+
     async def get_session(self)->BrowserSession:
+        if self.session is not None and not self.is_session_alive():
+            # The browser crashed under the session, start over on a relaunched one
+            await self.reset_session()
+            await self.browser.relaunch()
         if self.session is None:
             await self.init_session()
         return self.session
+
+    def is_session_alive(self)->bool:
+        if self.session.closed:
+            return False
+        browser=self.session.context.browser
+        return browser is None or browser.is_connected()
+
+    async def reset_session(self):
+        '''Forget a dead or hung session without waiting on it, the next get_session opens a fresh one.'''
+        if self.session is None:
+            return None
+        context=self.session.context
+        self.session=None
+        self.tab_registry.clear()
+        self.network_activity.clear()
+        self.expected_changes.clear()
+        try:
+            await asyncio.wait_for(context.close(),timeout=5)
+        except Exception:
+            pass
+
+    async def discard_page(self,page:Page):
+        self.tab_registry.pop(page,None)
+        self.network_activity.pop(page,None)
+        self.expected_changes.pop(page,None)
+        try:
+            await asyncio.wait_for(page.close(run_before_unload=False),timeout=5)
+        except Exception:
+            pass
+
+    async def replace_page(self)->Page:
+        '''Swap the current page for a blank one, used when it crashed or stopped responding.'''
+        session=await self.get_session()
+        await self.discard_page(session.current_page)
+        session.current_page=await session.context.new_page()
+        return session.current_page
     
     async def get_current_page(self)->Page:
         session=await self.get_session()
@@ -93,20 +191,31 @@ class Context:
                 'bypass_csp':self.config.disable_security,
                 'java_script_enabled':True,
                 'accept_downloads':True,
-                'no_viewport':True
+                'no_viewport':self.config.viewport is None,
+                'viewport':self.config.viewport,
+                'reduced_motion':self.config.reduced_motion,
+                'service_workers':self.config.service_workers
             }
         if browser is not None:
+            storage_state=self.storage.load(self.config.storage_state_key) if self.storage else None
+            if storage_state is not None:
+                parameters['storage_state']=storage_state
             context=await browser.new_context(**parameters)
-            with open('./src/agent/web/context/script.js') as f:
-                script=f.read()
-            await context.add_init_script(script)
+            await self.add_init_scripts(context)
+            if storage_state is not None and not await self.is_storage_state_valid(context):
+                self.storage.delete(self.config.storage_state_key)
+                # The localStorage of the stale snapshot has to go along with its cookies, a fresh context drops both
+                await context.close()
+                del parameters['storage_state']
+                context=await browser.new_context(**parameters)
+                await self.add_init_scripts(context)
         else:
             args=['--no-sandbox','--disable-blink-features=AutomationControlled','--disable-blink-features=IdleDetection','--no-infobars']
             parameters=parameters|{
                 'headless':self.browser.config.headless,
                 'slow_mo':self.browser.config.slow_mo,
                 'ignore_default_args': IGNORE_DEFAULT_ARGS,
-                'args': args+SECURITY_ARGS,
+                'args': args+SECURITY_ARGS+self.browser.config.args,
                 'user_data_dir': self.browser.config.user_data_dir,
                 'downloads_path': self.browser.config.downloads_dir,
                 'executable_path': self.browser.config.browser_instance_dir,
@@ -115,28 +224,201 @@ class Context:
             browser=self.browser.config.browser
             if browser=='chrome':
                 context=await self.browser.playwright.chromium.launch_persistent_context(channel='chrome',**parameters)
+            elif browser=='chromium':
+                context=await self.browser.playwright.chromium.launch_persistent_context(**parameters)
             elif browser=='firefox':
                 context=await self.browser.playwright.firefox.launch_persistent_context(**parameters)
             elif browser=='edge':
                 context=await self.browser.playwright.chromium.launch_persistent_context(channel='msedge',**parameters)
             else:
                 raise Exception('Invalid Browser Type')
+        if self.config.network_profile is not None:
+            await self.setup_network_filter(context)
         return context
+
+    async def add_init_scripts(self,context:PlaywrightContext):
+        with open('./src/agent/web/context/script.js') as f:
+            script=f.read()
+        await context.add_init_script(script)
+        if self.config.disable_animations:
+            await context.add_init_script(load_script('disable_animations'))
+
+    async def is_storage_state_valid(self,context:PlaywrightContext)->bool:
+        '''Probe the configured url with the request API of the context, a redirect or an error means the session expired.'''
+        if self.config.storage_state_probe_url is None:
+            return True
+        try:
+            response=await context.request.get(self.config.storage_state_probe_url,max_redirects=0,timeout=10*1000)
+        except Exception:
+            return False
+        return response.ok
+
+    async def save_storage_state(self):
+        '''Snapshot the cookies and localStorage of the session so the next context starts logged in.'''
+        if self.storage is None or self.session is None or self.browser.playwright_browser is None:
+            return None
+        try:
+            storage_state=await self.session.context.storage_state()
+        except Exception as e:
+            print(f'Storage state failed to save: {e}')
+            return None
+        self.storage.save(self.config.storage_state_key,storage_state)
+
+    async def setup_network_filter(self,context:PlaywrightContext):
+        '''Route every request of the context through the network filter, note that routing disables the HTTP cache.'''
+        context.on('response',self.record_response)
+        await context.route('**/*',self.filter_request)
+
+    async def set_network_profile(self,profile:NetworkProfile|None):
+        '''Switch the network filter profile for the next task, installing the route on first use.'''
+        install=self.config.network_profile is None and profile is not None
+        self.config=replace(self.config,network_profile=profile)
+        if install and self.session is not None:
+            await self.setup_network_filter(self.session.context)
+
+    def is_blocked_request(self,request:Request,profile:NetworkProfile)->bool:
+        if request.resource_type=='document' and request.is_navigation_request() and self.is_main_frame_request(request):
+            return False
+        if request.resource_type in profile.blocked_resource_types:
+            return True
+        if profile.block_ads:
+            host=urlparse(request.url).hostname or ''
+            return any(host==blocked_host or host.endswith(f'.{blocked_host}') for blocked_host in BLOCKED_HOSTS)
+        return False
+
+    def is_main_frame_request(self,request:Request)->bool:
+        '''Whether the request belongs to a top level page, ad iframes navigate subframes and stay blockable.'''
+        try:
+            return request.frame.parent_frame is None
+        except Exception:
+            # Requests of service workers have no frame
+            return False
+
+    async def filter_request(self,route:Route):
+        profile=self.config.network_profile
+        request=route.request
+        if profile is not None and self.is_blocked_request(request,profile):
+            self.network_stats.record_blocked(request.resource_type)
+            await route.abort('blockedbyclient')
+        else:
+            await route.fallback()
+
+    def record_response(self,response:Response):
+        content_length=response.headers.get('content-length')
+        if content_length and content_length.isdigit():
+            self.network_stats.record_loaded(response.request.resource_type,int(content_length))
     
-    async def get_all_tabs(self)->list[Tab]:
-        session=await self.get_session()
-        pages=session.context.pages
-        tabs:list[Tab]=[]
-        for id,page in enumerate(pages):
-            await page.wait_for_load_state('domcontentloaded')
+    def on_page(self,page:Page):
+        self.track_page(page)
+        self.register_tab(page)
+
+    def register_tab(self,page:Page):
+        '''Cache the url and title of a tab, kept up to date from its navigation and load events.'''
+        if page in self.tab_registry:
+            return None
+        self.tab_registry[page]=Tab(id=len(self.tab_registry),url=page.url,title='',page=page)
+        page.on('framenavigated',self.on_frame_navigated)
+        page.on('domcontentloaded',self.update_tab_title)
+        page.on('load',self.update_tab_title)
+        page.on('close',lambda page:self.tab_registry.pop(page,None))
+        task=asyncio.ensure_future(self.update_tab_title(page))
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+
+    async def on_frame_navigated(self,frame:Frame):
+        if frame.parent_frame is not None:
+            return None
+        tab=self.tab_registry.get(frame.page)
+        if tab is None:
+            return None
+        tab.url=frame.url
+        await self.update_tab_title(frame.page)
+
+    async def update_tab_title(self,page:Page):
+        try:
+            title=await page.title()
+        except Exception:
+            # The page closed or navigated, a later event refreshes the title
+            return None
+        tab=self.tab_registry.get(page)
+        if tab is not None:
+            tab.title=title
+
+    def track_page(self,page:Page):
+        '''Keep count of the in-flight relevant requests of a page for the network idle check.'''
+        if page in self.network_activity:
+            return None
+        activity=NetworkActivity()
+        self.network_activity[page]=activity
+        def on_request(request:Request):
+            if request.resource_type not in NETWORK_IDLE_RESOURCE_TYPES or self.is_ad_url(request.url):
+                return None
+            activity.requests.add(request)
+            activity.last_activity=monotonic()
+        def on_request_done(request:Request):
+            if request in activity.requests:
+                activity.requests.discard(request)
+                activity.last_activity=monotonic()
+        page.on('request',on_request)
+        page.on('requestfinished',on_request_done)
+        page.on('requestfailed',on_request_done)
+        page.on('close',lambda page:self.network_activity.pop(page,None))
+
+    async def wait_for_stable_page(self,page:Page=None)->float:
+        '''
+        Wait until the network went quiet and the DOM and layout stopped changing.
+
+        Waits at least `minimum_wait_page_load_time` and at most `maximum_wait_page_load_time` seconds,
+        returns the seconds spent waiting.
+        '''
+        page=page or await self.get_current_page()
+        expected_change=self.expected_changes.pop(page,None)
+        if expected_change=='none' and self.is_network_idle(page):
+            # Nothing changed after the click and nothing is loading, e.g. a search request still in flight
+            return 0.0
+        start=monotonic()
+        deadline=start+self.config.maximum_wait_page_load_time
+        with self.tracer.span('wait',url=page.url) as span:
             try:
-                url=page.url
-                title=await page.title()
+                await page.wait_for_load_state('domcontentloaded',timeout=self.config.maximum_wait_page_load_time*1000)
+                await asyncio.gather(self.wait_for_network_idle(page,deadline),self.wait_for_dom_idle(page,deadline))
             except Exception as e:
-                print(f'Tab failed to load: {e}')
-                continue
-            tabs.append(Tab(id=id,url=url,title=title,page=page))
-        return tabs
+                print(f'Page did not settle: {page.url}\nError: {e}')
+            remaining=self.config.minimum_wait_page_load_time-(monotonic()-start)
+            if remaining>0:
+                await asyncio.sleep(remaining)
+            span.attributes['timed_out']=monotonic()>=deadline
+        return monotonic()-start
+
+    def is_network_idle(self,page:Page)->bool:
+        self.track_page(page)
+        activity=self.network_activity.get(page)
+        idle_time=self.config.wait_for_network_idle_page_load_time
+        return activity is None or (not activity.requests and monotonic()-activity.last_activity>=idle_time)
+
+    async def wait_for_network_idle(self,page:Page,deadline:float):
+        while monotonic()<deadline and not self.is_network_idle(page):
+            await asyncio.sleep(0.1)
+
+    async def wait_for_dom_idle(self,page:Page,deadline:float):
+        script=load_script('dom_idle')
+        quiet=self.config.wait_for_dom_idle_page_load_time*1000
+        while monotonic()<deadline:
+            try:
+                await self.execute_script(page,script,[quiet,(deadline-monotonic())*1000])
+                break
+            except Exception:
+                # The page navigated while waiting, wait on the new document. A timeout of 0 means none to Playwright
+                remaining=deadline-monotonic()
+                if remaining<=0:
+                    break
+                await page.wait_for_load_state('domcontentloaded',timeout=max(remaining*1000,1))
+
+    async def get_all_tabs(self)->list[Tab]:
+        '''Answered from the tab registry, no browser round trips.'''
+        await self.get_session()
+        pages=[page for page in self.tab_registry if not page.is_closed()]
+        return [Tab(id=id,url=self.tab_registry[page].url,title=self.tab_registry[page].title,page=page) for id,page in enumerate(pages)]
     
     async def get_current_tab(self)->Tab:
         tabs=await self.get_all_tabs()
@@ -169,6 +451,131 @@ class Context:
             frame=page.main_frame
         return frame
 
+    async def click_element(self,handle:ElementHandle)->tuple[Literal['navigation','popup','mutation','none'],Page|None]:
+        '''
+        Click an element and race a main frame navigation, a popup and a DOM mutation against each other.
+
+        Returns which one happened first, with the new page for a popup, or 'none' when nothing happened
+        within `click_outcome_timeout` seconds.
+        '''
+        page=await self.get_current_page()
+        timeout=self.config.click_outcome_timeout
+        loop=asyncio.get_running_loop()
+        navigated,popup=loop.create_future(),loop.create_future()
+        def on_navigated(frame:Frame):
+            if frame.parent_frame is None and not navigated.done():
+                navigated.set_result(None)
+        def on_popup(new_page:Page):
+            if not popup.done():
+                popup.set_result(new_page)
+        is_hidden=await handle.evaluate('(element)=>element.checkVisibility?!element.checkVisibility():false')
+        if not is_hidden:
+            await handle.scroll_into_view_if_needed()
+        # Armed after scrolling, so changes caused by the scroll itself are not taken for the outcome
+        await handle.evaluate(load_script('arm_mutation'),timeout*1000)
+        page.on('framenavigated',on_navigated)
+        page.on('popup',on_popup)
+        try:
+            await handle.click(force=True)
+            mutated=asyncio.ensure_future(handle.evaluate('()=>window.__clickMutation'))
+            done,pending=await asyncio.wait({navigated,popup,mutated},timeout=timeout,return_when=asyncio.FIRST_COMPLETED)
+            for future in pending:
+                future.cancel()
+        finally:
+            page.remove_listener('framenavigated',on_navigated)
+            page.remove_listener('popup',on_popup)
+        if popup in done:
+            outcome,new_page='popup',popup.result()
+        elif navigated in done:
+            outcome,new_page='navigation',None
+        elif mutated in done and not mutated.exception() and mutated.result():
+            outcome,new_page='mutation',None
+        elif mutated in done and mutated.exception():
+            # The document went away under the evaluate, a navigation the event did not report yet
+            outcome,new_page='navigation',None
+        else:
+            outcome,new_page='none',None
+        self.expected_changes[page]=outcome
+        return outcome,new_page
+
+    async def fill_element(self,handle:ElementHandle,text:str,clear:bool=False)->Literal['fill','type']:
+        '''
+        Enter text into an input, textarea or contenteditable element and return the strategy used.
+
+        The value is set at once with input and change events, fields that detect synthetic input and the
+        sites listed in `typing_sites` get per-character key presses instead, as do hidden, disabled or read-only fields and
+        any field that rejected the value.
+        '''
+        page=await self.get_current_page()
+        probe:dict=await handle.evaluate(load_script('fill_probe'))
+        host=urlparse(page.url).netloc
+        value=text if clear else probe.get('value','')+text
+        if probe.get('editable') and not probe.get('keystrokes') and not any(host.endswith(site) for site in self.config.typing_sites):
+            try:
+                await handle.fill(value,timeout=self.config.fill_timeout*1000)
+                await handle.dispatch_event('change')
+                if (await handle.evaluate(load_script('read_value'))).strip()==value.strip():
+                    return 'fill'
+            except Exception:
+                pass
+            # The field reformatted or refused the value, start over with real key presses
+            text,clear=value,True
+        await handle.click(force=True)
+        if clear:
+            await page.keyboard.press('Control+A')
+            await page.keyboard.press('Backspace')
+        await page.keyboard.type(text,delay=self.config.typing_delay)
+        return 'type'
+
+    async def scroll_until(self,handle:ElementHandle|None=None,text:str=None,selector:str=None,item_selector:str=None,
+    max_items:int=50,max_scrolls:int=30,settle:float=0.3)->dict:
+        '''
+        Scroll the page or a container inside the browser until the text or selector shows up, the end is reached
+        or enough items were collected, all in one call.
+        '''
+        options={'text':text,'selector':selector,'itemSelector':item_selector,'maxItems':max_items,'maxScrolls':max_scrolls,'settle':settle*1000}
+        if handle is not None:
+            return await handle.evaluate(load_script('scroll_until'),options)
+        page=await self.get_current_page()
+        return await page.evaluate(f'(options)=>({load_script("scroll_until")})(null,options)',options)
+
+    async def fill_form(self,fields:dict[int,str|bool|list[str]])->dict[int,str]:
+        '''
+        Fill several form fields in one in-page call per frame and return the outcome per selector map index.
+
+        Text fields get their value with input and change events, selects pick options by label or value, checkboxes
+        and radios are clicked into the wanted state. Fields that only react to key presses are typed afterwards.
+        '''
+        results:dict[int,str]={}
+        groups:dict[str,list[tuple[int,ElementHandle,str|bool|list[str]]]]={}
+        for index,value in fields.items():
+            try:
+                element=await self.get_element_by_index(index=index)
+                handle=await self.get_handle_by_xpath(element.xpath)
+            except Exception as e:
+                results[index]=f'failed: {e}'
+                continue
+            groups.setdefault(element.xpath.get('frame',''),[]).append((index,handle,value))
+        try:
+            for group in groups.values():
+                items=[{'element':handle,'value':value} for _,handle,value in group]
+                outcomes:list[dict]=await group[0][1].evaluate(load_script('form_fill'),items)
+                for (index,handle,_),outcome in zip(group,outcomes):
+                    status,detail=outcome.get('status'),outcome.get('detail')
+                    if status=='type':
+                        try:
+                            await self.fill_element(handle,detail,clear=True)
+                            results[index]='typed'
+                        except Exception as e:
+                            results[index]=f'failed: {e}'
+                    else:
+                        results[index]=detail if status=='done' else f'failed: {detail}'
+        finally:
+            for group in groups.values():
+                for _,handle,_ in group:
+                    await self.dispose_handle(handle)
+        return {index:results[index] for index in fields}
+
     async def execute_script(self,obj:Frame|Page,script:str,args:list=None,enable_handle:bool=False):
         if enable_handle:
             handle=await obj.evaluate_handle(script,args)
@@ -192,18 +599,52 @@ class Context:
         frame_element=await frame.frame_element()
         if frame_element is None: 
             return False
-        style=await frame_element.get_attribute('style')
-        if style is not None:
-            css:dict=self.inline_style_parser(style)
-            if any([css.get('display')=='none',css.get('visibility')=='hidden']):
-                return False
-        bbox=await frame_element.bounding_box()
-        if bbox is None:
-            return False
-        area=bbox.get('width')*bbox.get('height')
-        if any([bbox.get('x')<0,bbox.get('y')<0,area<10]):
-            return False
-        return True
+        try:
+            return await frame_element.evaluate(load_script('frame_visibility'))
+        finally:
+            await self.dispose_handle(frame_element)
+
+    async def get_visible_frames(self,page:Page)->list[Frame]:
+        '''
+        Main frame followed by every descendant frame that is rendered along with all of its ancestors.
+
+        Each parent frame is probed with one in-page call over the computed styles and geometry of its iframe elements,
+        the results are matched onto the child frames by name and url. A child frame the probe cannot tell apart from a
+        sibling with another visibility is checked through its own frame element.
+        '''
+        visible_frames=[page.main_frame]
+        queue=[page.main_frame]
+        while queue:
+            parent=queue.pop(0)
+            if not parent.child_frames:
+                continue
+            try:
+                probes:list[dict]=await parent.evaluate(f'()=>({load_script("visible_frames")})({load_script("frame_visibility")})')
+            except Exception:
+                # The parent frame navigated or detached meanwhile, its children are gone with it
+                continue
+            for frame in parent.child_frames:
+                if frame.is_detached() or self.is_ad_url(frame.url):
+                    continue
+                matches={probe.get('visible') for probe in probes if probe.get('name')==frame.name and probe.get('url')==frame.url}
+                if len(matches)==1:
+                    is_visible=matches.pop()
+                else:
+                    try:
+                        is_visible=await self.is_frame_visible(frame)
+                    except Exception:
+                        is_visible=False
+                if is_visible:
+                    visible_frames.append(frame)
+                    queue.append(frame)
+        return visible_frames
+
+    async def dispose_handle(self,handle:JSHandle):
+        try:
+            await handle.dispose()
+        except Exception:
+            # The document of the handle is already gone, and the handle with it
+            pass
     
     async def get_screenshot(self,save_screenshot:bool=False,full_page:bool=False):
         page=await self.get_current_page()
@@ -214,16 +655,7 @@ class Context:
             path=folder_path.joinpath(f'screenshot_{date_time}.jpeg')
         else:
             path=None
-        await page.wait_for_timeout(2*1000)
-        screenshot=await page.screenshot(path=path,full_page=full_page,animations='disabled',type='jpeg')
+        with self.tracer.span('screenshot',full_page=full_page) as span:
+            screenshot=await page.screenshot(path=path,full_page=full_page,animations='disabled',type='jpeg')
+            span.attributes['bytes']=len(screenshot)
         return screenshot
-    
-    def inline_style_parser(self,style:str)->dict[str,str]:
-        styles = {}
-        if not style:
-            return styles
-        for rule in style.split(";"):
-            if ":" in rule:
-                prop, val = rule.split(":", 1)
-                styles[prop.strip()] = val.strip()
-        return styles
\ No newline at end of file
@@ -1,5 +1,11 @@
 from dataclasses import dataclass,field
-from typing import Optional,Any
+from typing import Optional,Any,Literal
+
+@dataclass
+class NetworkProfile:
+    '''Which requests the route-level network filter aborts.'''
+    block_ads:bool=True
+    blocked_resource_types:set[str]=field(default_factory=set)
 
 @dataclass
 class ContextConfig:
@@ -7,8 +13,36 @@ class ContextConfig:
     minimum_wait_page_load_time:float=0.5
     wait_for_network_idle_page_load_time:float=1
     maximum_wait_page_load_time:float=5
+    wait_for_dom_idle_page_load_time:float=0.3
     disable_security:bool=True
     user_agent:str="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36"
+    network_profile:Optional[NetworkProfile]=None
+    storage_state_dir:Optional[str]=None
+    storage_state_key:Optional[str]=None
+    storage_state_probe_url:Optional[str]=None
+    viewport:Optional[dict[str,int]]=None
+    reduced_motion:Optional[Literal['reduce','no-preference']]=None
+    disable_animations:bool=False
+    service_workers:Literal['allow','block']='allow'
+    # Hosts whose fields only accept real key presses, matched on the end of the hostname
+    typing_sites:set[str]=field(default_factory=set)
+    typing_delay:float=80
+    # Seconds a value set may wait for the field to become editable before falling back to key presses
+    fill_timeout:float=1
+    click_outcome_timeout:float=1.5
+
+    @classmethod
+    def throughput(cls,**kwargs)->'ContextConfig':
+        '''Preset for unattended runs: small fixed viewport, no animations or service workers and shorter settle windows.'''
+        return cls(**({
+            'viewport':{'width':1024,'height':768},
+            'reduced_motion':'reduce',
+            'disable_animations':True,
+            'service_workers':'block',
+            'minimum_wait_page_load_time':0.1,
+            'wait_for_network_idle_page_load_time':0.5,
+            'wait_for_dom_idle_page_load_time':0.2
+        }|kwargs))
 
 
 RELEVANT_FILE_EXTENSIONS = set([
@@ -57,6 +91,17 @@ RELEVANT_RESOURCE_TYPES = [
 	'iframe',
 ]
 
+# Requests the network idle wait keeps track of, data loads of client-rendered apps go through xhr and fetch
+NETWORK_IDLE_RESOURCE_TYPES = set([
+	'document',
+	'stylesheet',
+	'image',
+	'font',
+	'script',
+	'xhr',
+	'fetch',
+])
+
 IGNORED_URL_PATTERNS = set([
 	'analytics',
 	'tracking',
@@ -88,4 +133,34 @@ IGNORED_URL_PATTERNS = set([
 	'wss://',
 	'cloudfront.net',
 	'fastly.net'
-])
\ No newline at end of file
+])
+
+# Ad and tracker hosts, matched on the hostname and its subdomains only so first-party paths such as
+# /order-tracking or /api/analytics of the site being operated are never blocked
+BLOCKED_HOSTS = set([
+	'google-analytics.com',
+	'googletagmanager.com',
+	'googlesyndication.com',
+	'googleadservices.com',
+	'doubleclick.net',
+	'adservice.google.com',
+	'amazon-adsystem.com',
+	'cdn.optimizely.com',
+	'connect.facebook.net',
+	'hotjar.com',
+	'segment.io',
+	'cdn.segment.com',
+	'scorecardresearch.com',
+	'taboola.com',
+	'outbrain.com',
+	'criteo.com',
+	'criteo.net',
+	'onesignal.com',
+	'pushwoosh.com',
+])
+
+# Blocks ads and trackers only
+ADS_PROFILE=NetworkProfile(block_ads=True)
+
+# Also drops images, fonts and media for text-only tasks such as scraping and form filling
+LIGHTWEIGHT_PROFILE=NetworkProfile(block_ads=True,blocked_resource_types={'image','font','media'})
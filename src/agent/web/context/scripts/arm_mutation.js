@@ -0,0 +1,13 @@
+(element,timeout)=>{
+    // Resolves on the first DOM change after the click, or false once the timeout passed without one.
+    // Focus, hover and pressed styling only touch the attributes of the clicked element, they are no outcome
+    window.__clickMutation=new Promise(resolve=>{
+        const observer=new MutationObserver(records=>{
+            if(records.every(record=>record.type==='attributes'&&element.contains(record.target))) return;
+            observer.disconnect();
+            resolve(true);
+        });
+        observer.observe(document,{subtree:true,childList:true,attributes:true,characterData:true});
+        setTimeout(()=>{observer.disconnect();resolve(false);},timeout);
+    });
+}
@@ -0,0 +1,5 @@
+document.addEventListener('DOMContentLoaded',()=>{
+    const style=document.createElement('style');
+    style.textContent='*,*::before,*::after{animation:none!important;transition:none!important;scroll-behavior:auto!important;caret-color:auto!important}';
+    (document.head||document.documentElement).appendChild(style);
+});
@@ -0,0 +1,16 @@
+([quiet,timeout])=>new Promise(resolve=>{
+    const start=performance.now();
+    let last=start;
+    let layout='';
+    const observer=new MutationObserver(()=>{last=performance.now();});
+    observer.observe(document,{subtree:true,childList:true,attributes:true,characterData:true});
+    const check=()=>{
+        const now=performance.now();
+        const root=document.documentElement;
+        const current=root?`${root.scrollWidth}x${root.scrollHeight}`:'';
+        if(current!==layout){layout=current;last=now;}
+        if(now-last>=quiet||now-start>=timeout){observer.disconnect();resolve(now-start);}
+        else setTimeout(check,50);
+    };
+    setTimeout(check,50);
+})
@@ -0,0 +1,10 @@
+(element)=>{
+    const value=element.isContentEditable?element.innerText:(element.value??'');
+    // One-time-code boxes and autocomplete widgets react to key events, not to a value set
+    const keystrokes=element.autocomplete==='one-time-code'||element.maxLength===1||element.getAttribute('role')==='combobox'
+        ||element.hasAttribute('aria-autocomplete')||element.hasAttribute('list')||element.hasAttribute('data-type-keystrokes');
+    // A value set waits for these to go away, only key presses have a chance on such fields
+    const visible=element.checkVisibility?element.checkVisibility():element.getClientRects().length>0;
+    const editable=visible&&(element.isContentEditable||(!element.disabled&&!element.readOnly));
+    return {value,keystrokes,editable};
+}
@@ -0,0 +1,57 @@
+(_,fields)=>{
+    const setValue=(element,value)=>{
+        // The native setter keeps frameworks that patch the value property (React) in sync
+        const prototype=element.tagName==='TEXTAREA'?HTMLTextAreaElement.prototype:HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(prototype,'value').set.call(element,value);
+    };
+    const fire=(element)=>{
+        element.dispatchEvent(new Event('input',{bubbles:true}));
+        element.dispatchEvent(new Event('change',{bubbles:true}));
+    };
+    const truthy=(value)=>value===true||['true','yes','on','1','checked'].includes(String(value).toLowerCase());
+    return fields.map(({element,value})=>{
+        try{
+            const tag=element.tagName.toLowerCase();
+            const type=(element.getAttribute('type')||'').toLowerCase();
+            if(tag==='select'){
+                const labels=(Array.isArray(value)?value:[value]).map(label=>String(label).trim());
+                if(!element.multiple&&labels.length>1) return {status:'failed',detail:`only one option can be selected, got ${labels.join(', ')}`};
+                const options=Array.from(element.options);
+                const missing=labels.filter(label=>!options.some(option=>option.label.trim()===label||option.value===label));
+                if(missing.length) return {status:'failed',detail:`no option ${missing.join(', ')}`};
+                for(const option of options){
+                    const wanted=labels.includes(option.label.trim())||labels.includes(option.value);
+                    if(element.multiple) option.selected=wanted;
+                    else if(wanted) option.selected=true;
+                }
+                fire(element);
+                return {status:'done',detail:`selected ${labels.join(', ')}`};
+            }
+            if(tag==='input'&&(type==='checkbox'||type==='radio')){
+                const wanted=truthy(value);
+                // Clicking a radio never clears it, only selecting another radio of its group does
+                if(type==='radio'&&!wanted) return element.checked?{status:'failed',detail:'a selected radio can only be cleared by selecting another option of its group'}:{status:'done',detail:'left unselected'};
+                // A real click runs the handlers of custom checkboxes too
+                if(element.checked!==wanted) element.click();
+                return element.checked===wanted?{status:'done',detail:wanted?'checked':'unchecked'}:{status:'failed',detail:'did not toggle'};
+            }
+            if(tag==='input'&&type==='file') return {status:'failed',detail:'a file input takes files, not text, leave it out of the form'};
+            const text=Array.isArray(value)?value.join(', '):String(value);
+            const keystrokes=element.autocomplete==='one-time-code'||element.maxLength===1||element.getAttribute('role')==='combobox'
+                ||element.hasAttribute('aria-autocomplete')||element.hasAttribute('list')||element.hasAttribute('data-type-keystrokes');
+            if(keystrokes) return {status:'type',detail:text};
+            if(element.isContentEditable){
+                element.focus();
+                element.innerText=text;
+                element.dispatchEvent(new Event('input',{bubbles:true}));
+                return {status:'done',detail:'filled'};
+            }
+            if(tag!=='input'&&tag!=='textarea') return {status:'failed',detail:`${tag} is not a form field`};
+            setValue(element,text);
+            fire(element);
+            return element.value===text?{status:'done',detail:'filled'}:{status:'type',detail:text};
+        }catch(error){
+            return {status:'failed',detail:String(error)};
+        }
+    });
+}
@@ -0,0 +1,11 @@
+(element)=>{
+    const style=window.getComputedStyle(element);
+    if(style.display==='none'||style.visibility==='hidden'||style.visibility==='collapse'||parseFloat(style.opacity)===0){
+        return false;
+    }
+    if(element.checkVisibility&&!element.checkVisibility({visibilityProperty:true,opacityProperty:true})){
+        return false;
+    }
+    const rect=element.getBoundingClientRect();
+    return rect.x>=0&&rect.y>=0&&rect.width*rect.height>=10;
+}
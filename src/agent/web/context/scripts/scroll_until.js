@@ -0,0 +1,62 @@
+async (container,options)=>{
+    const {text,selector,itemSelector,maxItems,maxScrolls,settle}=options;
+    const scope=container||document;
+    const scroller=container||document.scrollingElement||document.documentElement;
+    const step=Math.max(100,(container?container.clientHeight:window.innerHeight)*0.8);
+    const needle=text?text.toLowerCase():null;
+    const seen=new Set();
+    const items=[];
+    // Virtualized lists recycle their nodes, collect every item the moment it is rendered
+    const collect=()=>{
+        if(!itemSelector) return false;
+        for(const element of scope.querySelectorAll(itemSelector)){
+            const content=element.innerText.replace(/\s+/g,' ').trim().slice(0,300);
+            if(content&&!seen.has(content)){
+                seen.add(content);
+                items.push(content);
+                if(items.length>=maxItems) return true;
+            }
+        }
+        return false;
+    };
+    const find=()=>{
+        if(selector){
+            const element=scope.querySelector(selector);
+            if(element) return element;
+        }
+        if(needle){
+            // Text of scripts, styles and hidden elements is never what the user sees
+            const walker=document.createTreeWalker(container||document.body,NodeFilter.SHOW_TEXT,{acceptNode:node=>{
+                const parent=node.parentElement;
+                if(!parent||parent.closest('script,style,noscript,template')) return NodeFilter.FILTER_REJECT;
+                if(parent.checkVisibility?!parent.checkVisibility():!parent.getClientRects().length) return NodeFilter.FILTER_REJECT;
+                return NodeFilter.FILTER_ACCEPT;
+            }});
+            while(walker.nextNode()){
+                if(walker.currentNode.textContent.toLowerCase().includes(needle)) return walker.currentNode.parentElement;
+            }
+        }
+        return null;
+    };
+    const settled=()=>new Promise(resolve=>{
+        let timer=setTimeout(done,settle);
+        // A page that never stops mutating (tickers, carousels, clocks) still settles at this deadline
+        const deadline=setTimeout(done,settle*3);
+        const observer=new MutationObserver(()=>{clearTimeout(timer);timer=setTimeout(done,100);});
+        observer.observe(scope===document?document.body:scope,{childList:true,subtree:true});
+        function done(){clearTimeout(timer);clearTimeout(deadline);observer.disconnect();resolve();}
+    });
+    let scrolls=0,stalled=0,found=null,full=false;
+    while(true){
+        full=collect();
+        found=find();
+        if(found||full||scrolls>=maxScrolls||stalled>=2) break;
+        const position=scroller.scrollTop,height=scroller.scrollHeight;
+        container?container.scrollBy(0,step):window.scrollBy(0,step);
+        scrolls+=1;
+        await settled();
+        stalled=scroller.scrollTop===position&&scroller.scrollHeight===height?stalled+1:0;
+    }
+    if(found) found.scrollIntoView({block:'center'});
+    return {found:found?found.innerText.replace(/\s+/g,' ').trim().slice(0,300):null,items,scrolls,end:stalled>=2};
+}
@@ -0,0 +1,12 @@
+(isVisible)=>{
+    return Array.from(document.querySelectorAll('iframe,frame')).map(element=>{
+        let url=element.src||'about:blank';
+        try{
+            url=element.contentWindow.location.href;
+        }catch(error){
+            // A cross-origin document hides its location, the src is what it was loaded from
+        }
+        // Playwright names a frame after the name attribute of its element, or the id when there is none
+        return {name:element.getAttribute('name')||element.id||'',url,visible:isVisible(element)};
+    });
+}
@@ -2,6 +2,8 @@ from dataclasses import dataclass,field
 from playwright.async_api import Page,BrowserContext as PlaywrightBrowserContext
 from src.agent.web.dom.views import DOMState
 from typing import Optional
+from time import monotonic
+from uuid import uuid4
 
 @dataclass 
 class Tab:
@@ -27,4 +29,35 @@ class BrowserState:
 class BrowserSession:
 	context: PlaywrightBrowserContext
 	current_page: Page
-	state: BrowserState
\ No newline at end of file
+	state: BrowserState
+	# Tells sessions apart for caches, unlike the id of the context object it is never reused
+	id: str = field(default_factory=lambda:uuid4().hex)
+	# Set by the close event, the only sign of death of a persistent context which has no browser object
+	closed: bool = False
+
+@dataclass
+class NetworkActivity:
+	requests:set=field(default_factory=set)
+	last_activity:float=field(default_factory=monotonic)
+
+@dataclass
+class NetworkStats:
+	blocked_requests:dict[str,int]=field(default_factory=dict)
+	blocked_bytes:int=0
+	loaded_requests:dict[str,int]=field(default_factory=dict)
+	loaded_bytes:dict[str,int]=field(default_factory=dict)
+
+	def record_loaded(self,resource_type:str,size:int):
+		self.loaded_requests[resource_type]=self.loaded_requests.get(resource_type,0)+1
+		self.loaded_bytes[resource_type]=self.loaded_bytes.get(resource_type,0)+size
+
+	def record_blocked(self,resource_type:str):
+		# The body of an aborted request is never seen, estimate it from the loaded requests of the same type
+		self.blocked_requests[resource_type]=self.blocked_requests.get(resource_type,0)+1
+		if self.loaded_requests.get(resource_type):
+			self.blocked_bytes+=self.loaded_bytes[resource_type]//self.loaded_requests[resource_type]
+
+	def to_string(self)->str:
+		total=sum(self.blocked_requests.values())
+		by_type=', '.join(f'{resource_type}: {count}' for resource_type,count in self.blocked_requests.items())
+		return f'Blocked {total} requests ({by_type}) saving ~{self.blocked_bytes/1024:.1f} KB'
@@ -10,18 +10,27 @@ class DOM:
     def __init__(self, context:'Context'):
         self.context=context
 
-    async def get_state(self,use_vision:bool=False,freeze:bool=False)->tuple[str|None,DOMState]:
+    async def get_state(self,use_vision:bool=False,freeze:bool=False,settle:bool=True)->tuple[str|None,DOMState]:
         '''Get the state of the webpage.'''
+        with self.context.tracer.span('dom',use_vision=use_vision) as span:
+            screenshot,dom_state=await self.extract_state(use_vision=use_vision,freeze=freeze,settle=settle)
+            span.attributes['interactive']=len(dom_state.interactive_nodes)
+            span.attributes['informative']=len(dom_state.informative_nodes)
+            span.attributes['scrollable']=len(dom_state.scrollable_nodes)
+        return screenshot,dom_state
+
+    async def extract_state(self,use_vision:bool=False,freeze:bool=False,settle:bool=True)->tuple[str|None,DOMState]:
         try:
             if freeze:
                 await sleep(5)
             with open('./src/agent/web/dom/script.js') as f:
                 script=f.read()
             page=await self.context.get_current_page()
-            await page.wait_for_load_state('domcontentloaded',timeout=10*1000)
+            if settle:
+                await self.context.wait_for_stable_page(page)
             await self.context.execute_script(page,script)
-            #Access from frames
-            frames=page.frames
+            #Access from the frames that are actually rendered
+            frames=await self.context.get_visible_frames(page)
             interactive_nodes,informative_nodes,scrollable_nodes=await self.get_elements(frames=frames)
             if use_vision:
                 # Add bounding boxes to the interactive elements
@@ -51,15 +60,12 @@ class DOM:
             for index,frame in enumerate(frames):
                 if frame.is_detached() or frame.url=='about:blank':
                     continue
-                # print(f"Getting elements from frame: {frame.url}")
-                await self.context.execute_script(frame,script)  # Inject JS
-                #index=0 means Main Frame
-                if index>0 and not await self.context.is_frame_visible(frame=frame):
-                    continue
-                # print(f"Getting elements from frame: {frame.url}")
-                await self.context.execute_script(frame,script)
-                nodes:dict=await self.context.execute_script(frame,'getElements()')
-                element_nodes,textual_nodes,scrollable_nodes=nodes.values()
+                with self.context.tracer.span('dom.frame',url=frame.url,main=index==0) as span:
+                    # print(f"Getting elements from frame: {frame.url}")
+                    await self.context.execute_script(frame,script)  # Inject JS
+                    nodes:dict=await self.context.execute_script(frame,'getElements()')
+                    element_nodes,textual_nodes,scrollable_nodes=nodes.values()
+                    span.attributes['elements']=len(element_nodes)+len(textual_nodes)+len(scrollable_nodes)
                 if index>0:
                     frame_element =await frame.frame_element()
                     frame_xpath=await self.context.execute_script(frame,'(frame_element)=>getXPath(frame_element)',frame_element)
@@ -40,7 +40,7 @@ class DOMElementNode:
         return f"DOMElementNode(tag='{self.tag}', role='{self.role}', name='{self.name}', attributes={self.attributes}, cordinates={self.center}, bounding_box={self.bounding_box}, xpath='{self.xpath}')"
     
     def to_dict(self)->dict[str,str]:
-        return {'tag':self.tag,'role':self.role,'name':self.name,'bounding_box':self.bounding_box.to_dict(),'attributes':self.attributes, 'cordinates':self.center.to_dict()}
+        return {'tag':self.tag,'role':self.role,'name':self.name,'bounding_box':self.bounding_box.to_dict(),'attributes':self.attributes, 'cordinates':self.center.to_dict(), 'xpath':self.xpath}
 
 @dataclass
 class ScrollElementNode:
@@ -55,7 +55,7 @@ class ScrollElementNode:
         return f"ScrollableElementNode(tag='{self.tag}', role='{self.role}', name='{shorten(self.name,width=500)}', attributes={self.attributes}, xpath='{self.xpath}')"
     
     def to_dict(self)->dict[str,str]:
-        return {'tag':self.tag,'role':self.role,'name':self.name,'attributes':self.attributes}
+        return {'tag':self.tag,'role':self.role,'name':self.name,'attributes':self.attributes,'xpath':self.xpath}
 
 @dataclass
 class DOMTextualNode:
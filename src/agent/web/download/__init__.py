@@ -0,0 +1,155 @@
+from src.agent.web.context.config import RELEVANT_CONTEXT_TYPES,RELEVANT_FILE_EXTENSIONS
+from src.agent.web.download.views import DownloadProgress
+from src.agent.web.fetch import get_client
+from typing import Callable
+from time import monotonic
+from pathlib import Path
+import asyncio
+import httpx
+import json
+import re
+
+CHUNK_SIZE=8*2**20
+PARALLEL_THRESHOLD=32*2**20
+
+class DownloadError(Exception):
+    pass
+
+def is_downloadable(content_type:str,path:Path)->bool:
+    '''A known file type, or a generic binary response whose target name has a known file extension.'''
+    content_type=content_type.split(';')[0].strip().lower()
+    if content_type in RELEVANT_CONTEXT_TYPES:
+        return True
+    return content_type!='text/html' and path.suffix.lower() in RELEVANT_FILE_EXTENSIONS
+
+def parse_content_range(content_range:str)->int|None:
+    '''Total size of a `Content-Range` header, None when it is missing or unknown (`bytes 0-0/*`).'''
+    match=re.match(r'bytes \d+-\d+/(\d+)',(content_range or '').strip())
+    return int(match.group(1)) if match else None
+
+class Downloader:
+    '''
+    Streams one file to disk, in parallel byte ranges when the server supports them.
+
+    The body goes to `<name>.part` and ranged downloads keep the finished chunks in `<name>.part.json`,
+    so an interrupted download resumes from the last complete chunk instead of starting over.
+    '''
+    def __init__(self,url:str,path:Path,headers:dict=None,connections:int=4,chunk_size:int=CHUNK_SIZE,
+    parallel_threshold:int=PARALLEL_THRESHOLD,on_progress:Callable[[DownloadProgress],None]=None,progress_interval:float=2):
+        self.url=url
+        self.path=path
+        # Ranges have to address the bytes as stored, not a compressed transfer encoding of them
+        self.headers=(headers or {})|{'Accept-Encoding':'identity'}
+        self.connections=connections
+        self.chunk_size=chunk_size
+        self.parallel_threshold=parallel_threshold
+        self.on_progress=on_progress
+        self.progress_interval=progress_interval
+        self.part_path=path.with_name(f'{path.name}.part')
+        self.state_path=path.with_name(f'{path.name}.part.json')
+        self.progress=DownloadProgress(url=url)
+        self.last_report=monotonic()
+
+    def advance(self,size:int):
+        self.progress.downloaded+=size
+        if self.on_progress and monotonic()-self.last_report>=self.progress_interval:
+            self.last_report=monotonic()
+            self.on_progress(self.progress)
+
+    async def download(self)->DownloadProgress:
+        self.path.parent.mkdir(parents=True,exist_ok=True)
+        client=get_client()
+        # A one byte range probe tells the size and range support without pulling the body
+        async with client.stream('GET',self.url,headers=self.headers|{'Range':'bytes=0-0'}) as response:
+            if response.status_code>=400:
+                raise DownloadError(f'{self.url} answered with status {response.status_code}')
+            content_type=response.headers.get('content-type','')
+            if not is_downloadable(content_type,self.path):
+                raise DownloadError(f'{self.url} is not a downloadable file (content type {content_type or "unknown"})')
+            total=parse_content_range(response.headers.get('content-range')) if response.status_code==206 else None
+            if response.status_code==200:
+                # No range support, the probe response already carries the whole body
+                await self.stream_whole(response)
+        if response.status_code==206 and total is None:
+            # Ranges are honoured but the size is unknown, the probe only carries the first byte
+            async with client.stream('GET',self.url,headers=self.headers) as response:
+                if response.status_code!=200:
+                    raise DownloadError(f'{self.url} answered with status {response.status_code}')
+                await self.stream_whole(response)
+        elif total is not None:
+            await self.stream_ranges(total)
+        elif response.status_code!=200:
+            raise DownloadError(f'{self.url} answered with status {response.status_code}')
+        self.part_path.replace(self.path)
+        self.state_path.unlink(missing_ok=True)
+        if self.on_progress:
+            self.on_progress(self.progress)
+        return self.progress
+
+    async def stream_whole(self,response:httpx.Response):
+        content_length=response.headers.get('content-length')
+        self.progress.total=int(content_length) if content_length and content_length.isdigit() else None
+        with open(self.part_path,'wb') as f:
+            async for chunk in response.aiter_bytes():
+                f.write(chunk)
+                self.advance(len(chunk))
+
+    def load_done_chunks(self,total:int)->set[int]:
+        if not (self.part_path.exists() and self.state_path.exists()):
+            return set()
+        try:
+            state=json.loads(self.state_path.read_text())
+        except (OSError,ValueError):
+            return set()
+        if state.get('url')!=self.url or state.get('total')!=total or state.get('chunk_size')!=self.chunk_size:
+            return set()
+        return set(state.get('done',[]))
+
+    def save_done_chunks(self,total:int,done:set[int]):
+        state={'url':self.url,'total':total,'chunk_size':self.chunk_size,'done':sorted(done)}
+        self.state_path.write_text(json.dumps(state))
+
+    async def stream_ranges(self,total:int):
+        chunks=[(index,start,min(start+self.chunk_size,total)-1) for index,start in enumerate(range(0,total,self.chunk_size))]
+        done=self.load_done_chunks(total)
+        if not done:
+            with open(self.part_path,'wb') as f:
+                f.truncate(total)
+        resumed=sum(end-start+1 for index,start,end in chunks if index in done)
+        self.progress.total=total
+        self.progress.downloaded=self.progress.resumed=resumed
+        queue=asyncio.Queue()
+        for chunk in chunks:
+            if chunk[0] not in done:
+                queue.put_nowait(chunk)
+        connections=self.connections if total>=self.parallel_threshold else 1
+        self.progress.connections=max(1,min(connections,queue.qsize()))
+        async def worker():
+            with open(self.part_path,'r+b') as f:
+                while not queue.empty():
+                    index,start,end=queue.get_nowait()
+                    await self.stream_chunk(f,start,end)
+                    done.add(index)
+                    self.save_done_chunks(total,done)
+        workers=[asyncio.ensure_future(worker()) for _ in range(self.progress.connections)]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            # Stop the other connections, the chunks they finished stay recorded for the resume
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers,return_exceptions=True)
+            raise
+
+    async def stream_chunk(self,f,start:int,end:int):
+        async with get_client().stream('GET',self.url,headers=self.headers|{'Range':f'bytes={start}-{end}'}) as response:
+            if response.status_code!=206:
+                raise DownloadError(f'{self.url} stopped honouring byte ranges (status {response.status_code})')
+            f.seek(start)
+            received=0
+            async for chunk in response.aiter_bytes():
+                f.write(chunk)
+                received+=len(chunk)
+                self.advance(len(chunk))
+        if received!=end-start+1:
+            raise DownloadError(f'Incomplete chunk {start}-{end} of {self.url}, the download can be resumed')
@@ -0,0 +1,28 @@
+from dataclasses import dataclass,field
+from typing import Optional
+from time import monotonic
+
+@dataclass
+class DownloadProgress:
+    url:str
+    total:Optional[int]=None
+    downloaded:int=0
+    # Bytes already on disk from an earlier, interrupted attempt
+    resumed:int=0
+    connections:int=1
+    started:float=field(default_factory=monotonic)
+
+    @property
+    def elapsed(self)->float:
+        return monotonic()-self.started
+
+    @property
+    def throughput(self)->float:
+        '''Bytes per second transferred by this attempt.'''
+        return (self.downloaded-self.resumed)/max(self.elapsed,1e-6)
+
+    def to_string(self)->str:
+        size=f'{self.downloaded/2**20:.1f} MB'
+        if self.total:
+            size+=f' of {self.total/2**20:.1f} MB ({100*self.downloaded/self.total:.0f}%)'
+        return f'{size} at {self.throughput/2**20:.2f} MB/s over {self.connections} connection(s)'
@@ -0,0 +1,118 @@
+from src.agent.web.extract.views import Extraction
+from typing import TYPE_CHECKING,Literal
+from pathlib import Path
+import json
+import csv
+import re
+
+if TYPE_CHECKING:
+    from src.agent.web.context import Context
+
+SAMPLE_SIZE=5
+
+NUMBER=re.compile(r'^[-+]?[$€£¥]?\s?\d[\d,. ]*%?$')
+URL=re.compile(r'^https?://')
+
+class ExtractionError(Exception):
+    pass
+
+def infer_type(values:list[str])->str:
+    values=[value for value in values if value]
+    if not values:
+        return 'empty'
+    if all(URL.match(value) for value in values):
+        return 'url'
+    if all(NUMBER.match(value) for value in values):
+        return 'number'
+    return 'text'
+
+def merge_types(first:str,second:str)->str:
+    '''Type of a column holding the values of both types, an empty page says nothing about it.'''
+    if first=='empty' or first==second:
+        return second
+    if second=='empty':
+        return first
+    return 'text'
+
+class RecordWriter:
+    '''Appends records to a CSV or JSON Lines file as each page is extracted, so rows never pile up in memory.'''
+    def __init__(self,path:Path,columns:list[str],format:Literal['csv','jsonl']):
+        path.parent.mkdir(parents=True,exist_ok=True)
+        self.file=open(path,'w',encoding='utf-8',newline='')
+        self.columns=columns
+        self.format=format
+        if format=='csv':
+            self.writer=csv.DictWriter(self.file,fieldnames=columns,extrasaction='ignore')
+            self.writer.writeheader()
+
+    def write(self,records:list[dict[str,str]]):
+        for record in records:
+            if self.format=='csv':
+                self.writer.writerow(record)
+            else:
+                self.file.write(json.dumps(record,ensure_ascii=False)+'\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+async def extract_page(context:'Context',selector:str=None)->dict:
+    page=await context.get_current_page()
+    with open('./src/agent/web/extract/script.js') as f:
+        script=f.read()
+    dataset:dict=await context.execute_script(page,script,{'selector':selector})
+    if dataset.get('error'):
+        raise ExtractionError(dataset.get('error'))
+    return dataset
+
+async def go_to_next_page(context:'Context',next_selector:str)->bool:
+    page=await context.get_current_page()
+    button=page.locator(next_selector).first
+    if not await button.count() or not await button.is_visible() or not await button.is_enabled():
+        return False
+    await button.click()
+    await context.wait_for_stable_page(page)
+    return True
+
+async def extract_records(context:'Context',path:Path,selector:str=None,next_selector:str=None,max_pages:int=1,format:Literal['csv','jsonl']='csv')->Extraction:
+    '''
+    Serialize the table or repeated list of the current page into a file, following the next page control
+    up to `max_pages` pages. Later pages reuse the container found on the first one.
+    '''
+    dataset=await extract_page(context,selector)
+    columns=dataset.get('columns')
+    extraction=Extraction(kind=dataset.get('kind'),selector=dataset.get('selector'),columns=columns,path=path)
+    writer=RecordWriter(path,columns,format)
+    types={column:'empty' for column in columns}
+    previous=None
+    try:
+        while True:
+            page_columns=dataset.get('columns')
+            # The file keeps the columns of the first page, later rows are mapped onto them by name
+            for column in page_columns:
+                if column not in columns and column not in extraction.dropped_columns:
+                    extraction.dropped_columns.append(column)
+            rows=[dict(zip(page_columns,row)) for row in dataset.get('rows')]
+            records=[{column:row.get(column,'') for column in columns} for row in rows]
+            # A next control that did not change the content means the last page was reached
+            if records==previous:
+                break
+            writer.write(records)
+            extraction.rows+=len(records)
+            extraction.pages+=1
+            if len(extraction.sample)<SAMPLE_SIZE:
+                extraction.sample+=records[:SAMPLE_SIZE-len(extraction.sample)]
+            for column in columns:
+                types[column]=merge_types(types[column],infer_type([record[column] for record in records]))
+            previous=records
+            if next_selector is None or extraction.pages>=max_pages or not await go_to_next_page(context,next_selector):
+                break
+            try:
+                dataset=await extract_page(context,extraction.selector)
+            except ExtractionError:
+                # The page re-rendered the container elsewhere, detect it again
+                dataset=await extract_page(context,selector)
+    finally:
+        writer.close()
+    extraction.types=types
+    return extraction
@@ -0,0 +1,124 @@
+(options)=>{
+    const MAX_COLUMNS=30
+    const MIN_REPEATS=3
+
+    const clean=(text)=>(text||'').replace(/\s+/g,' ').trim()
+
+    const isVisible=(element)=>{
+        const style=window.getComputedStyle(element)
+        return style.display!=='none'&&style.visibility!=='hidden'&&element.getClientRects().length>0
+    }
+
+    const cssPath=(element)=>{
+        const parts=[]
+        while(element&&element.nodeType===Node.ELEMENT_NODE&&element!==document.body){
+            if(element.id&&document.querySelectorAll(`#${CSS.escape(element.id)}`).length===1){
+                parts.unshift(`#${CSS.escape(element.id)}`)
+                return parts.join(' > ')
+            }
+            let index=1
+            for(let sibling=element.previousElementSibling;sibling;sibling=sibling.previousElementSibling){
+                if(sibling.tagName===element.tagName) index+=1
+            }
+            parts.unshift(`${element.tagName.toLowerCase()}:nth-of-type(${index})`)
+            element=element.parentElement
+        }
+        parts.unshift('body')
+        return parts.join(' > ')
+    }
+
+    const signature=(element)=>`${element.tagName}.${Array.from(element.classList).sort().join('.')}`
+
+    const extractTable=(table)=>{
+        const rows=Array.from(table.rows).filter(isVisible)
+        if(!rows.length) return null
+        const headerRow=table.tHead&&table.tHead.rows.length?table.tHead.rows[0]:(Array.from(rows[0].cells).every(cell=>cell.tagName==='TH')?rows[0]:null)
+        const width=Math.max(...rows.map(row=>row.cells.length))
+        const columns=Array.from({length:width},(_,index)=>{
+            const cell=headerRow?headerRow.cells[index]:null
+            return clean(cell?cell.innerText:'')||`column_${index+1}`
+        })
+        const body=rows.filter(row=>row!==headerRow&&!(table.tHead&&table.tHead.contains(row)))
+        return {kind:'table',columns,rows:body.map(row=>columns.map((_,index)=>row.cells[index]?clean(row.cells[index].innerText):''))}
+    }
+
+    // One record per repeated item, a field per distinct class (or tag) of the descendants that hold text
+    const extractList=(container,items)=>{
+        const columns=[]
+        const records=items.map(item=>{
+            const record={}
+            const add=(key,value)=>{
+                if(!value) return
+                if(!columns.includes(key)){
+                    if(columns.length>=MAX_COLUMNS) return
+                    columns.push(key)
+                }
+                record[key]=record[key]?`${record[key]} ${value}`:value
+            }
+            for(const element of [item,...item.querySelectorAll('*')]){
+                if(!isVisible(element)) continue
+                const key=element===item?'text':(element.classList[0]||element.tagName.toLowerCase())
+                const ownText=clean(Array.from(element.childNodes).filter(node=>node.nodeType===Node.TEXT_NODE).map(node=>node.textContent).join(' '))
+                add(key,ownText)
+                if(element.tagName==='A'&&element.href) add(`${key}_url`,element.href)
+                if(element.tagName==='IMG'&&element.src&&!element.src.startsWith('data:')) add(`${key}_src`,element.src)
+            }
+            return record
+        })
+        return {kind:'list',columns,rows:records.map(record=>columns.map(column=>record[column]||''))}
+    }
+
+    const repeatedItems=(container)=>{
+        const groups=new Map()
+        for(const child of container.children){
+            if(!isVisible(child)) continue
+            const key=signature(child)
+            if(!groups.has(key)) groups.set(key,[])
+            groups.get(key).push(child)
+        }
+        let best=[]
+        for(const group of groups.values()){
+            if(group.length>best.length) best=group
+        }
+        return best
+    }
+
+    const score=(dataset)=>dataset.rows.length*Math.min(dataset.columns.length,10)
+
+    const extractFrom=(container)=>{
+        if(container.tagName==='TABLE') return extractTable(container)
+        const table=container.querySelector('table')
+        const items=repeatedItems(container)
+        if(items.length>=MIN_REPEATS) return extractList(container,items)
+        return table?extractTable(table):null
+    }
+
+    let dataset=null
+    let container=null
+    if(options.selector){
+        container=document.querySelector(options.selector)
+        if(!container) return {error:`No element matches ${options.selector}`}
+        dataset=extractFrom(container)
+    }else{
+        // Tables and containers of repeated siblings compete on rows times columns, estimated cheaply first
+        const candidates=[]
+        for(const table of document.querySelectorAll('table')){
+            if(table.rows.length>=2&&isVisible(table)) candidates.push({element:table,estimate:table.rows.length*Math.min(table.rows[0].cells.length,10)})
+        }
+        for(const element of document.body.querySelectorAll('*')){
+            if(element.children.length<MIN_REPEATS||['TABLE','TBODY','THEAD','TR','SELECT','HEAD'].includes(element.tagName)) continue
+            const items=repeatedItems(element)
+            if(items.length>=MIN_REPEATS) candidates.push({element,items,estimate:items.length*Math.min(items[0].querySelectorAll('*').length+1,10)})
+        }
+        candidates.sort((a,b)=>b.estimate-a.estimate)
+        for(const candidate of candidates.slice(0,5)){
+            const result=candidate.items?extractList(candidate.element,candidate.items):extractTable(candidate.element)
+            if(result&&(!dataset||score(result)>score(dataset))){
+                dataset=result
+                container=candidate.element
+            }
+        }
+    }
+    if(!dataset||!dataset.rows.length) return {error:'No table or repeated list found on the page'}
+    return {...dataset,selector:cssPath(container)}
+}
@@ -0,0 +1,24 @@
+from dataclasses import dataclass,field
+from textwrap import shorten
+from pathlib import Path
+import json
+
+@dataclass
+class Extraction:
+    kind:str
+    selector:str
+    columns:list[str]
+    path:Path
+    rows:int=0
+    pages:int=0
+    sample:list[dict[str,str]]=field(default_factory=list)
+    types:dict[str,str]=field(default_factory=dict)
+    dropped_columns:list[str]=field(default_factory=list)
+
+    def schema_to_string(self)->str:
+        return '\n'.join(f'- {column}: {self.types.get(column,"text")}' for column in self.columns)
+
+    def to_string(self)->str:
+        sample='\n'.join(f'{index+1}. {json.dumps({column:shorten(value,width=100) for column,value in row.items()},ensure_ascii=False)}' for index,row in enumerate(self.sample))
+        dropped=f'\nColumns that only appeared on later pages were left out: {", ".join(self.dropped_columns)}' if self.dropped_columns else ''
+        return f'Extracted {self.rows} rows from a {self.kind} ({self.selector}) across {self.pages} page(s) and saved them to {self.path}\nColumns:\n{self.schema_to_string()}{dropped}\nSample rows:\n{sample}'
@@ -0,0 +1,70 @@
+from bs4 import BeautifulSoup
+from http.cookiejar import CookieJar
+import asyncio
+import httpx
+
+# Ids of the mount points client-rendered apps fill in from JavaScript
+APP_ROOT_IDS=['root','app','__next','__nuxt','svelte','ember-app']
+
+MIN_TEXT_LENGTH=200
+
+clients:dict[asyncio.AbstractEventLoop,httpx.AsyncClient]={}
+
+class NullCookieJar(CookieJar):
+    '''Never stores a cookie, the callers pass the cookies of their own session with every request.'''
+    def set_cookie(self,cookie):
+        pass
+
+    def extract_cookies(self,response,request):
+        pass
+
+def get_client()->httpx.AsyncClient:
+    '''
+    A pooled client shared by the HTTP tools, one per event loop since its connections are bound to the loop.
+
+    It keeps no cookies, a `Set-Cookie` of one session must never reach the requests of another.
+    '''
+    loop=asyncio.get_running_loop()
+    for closed_loop in [closed_loop for closed_loop in clients if closed_loop.is_closed()]:
+        del clients[closed_loop]
+    client=clients.get(loop)
+    if client is None or client.is_closed:
+        limits=httpx.Limits(max_connections=100,max_keepalive_connections=20)
+        client=httpx.AsyncClient(limits=limits,follow_redirects=True,timeout=httpx.Timeout(30,connect=10),cookies=NullCookieJar())
+        clients[loop]=client
+    return client
+
+def needs_javascript(soup:BeautifulSoup)->bool:
+    '''Guess whether the HTML only becomes readable after its scripts run.'''
+    for root_id in APP_ROOT_IDS:
+        root=soup.find(id=root_id)
+        if root is not None and not root.get_text(strip=True):
+            return True
+    noscript=' '.join(tag.get_text(' ',strip=True) for tag in soup.find_all('noscript')).lower()
+    has_scripts=soup.find('script') is not None
+    for tag in soup(['script','style','noscript','template']):
+        tag.decompose()
+    text=soup.body.get_text(' ',strip=True) if soup.body else ''
+    if 'javascript' in noscript and len(text)<5*MIN_TEXT_LENGTH:
+        return True
+    # A short page without scripts is simply short
+    return has_scripts and len(text)<MIN_TEXT_LENGTH
+
+async def fetch_html(url:str,user_agent:str=None,cookies:list[dict]=None)->str|None:
+    '''
+    Fetch the HTML of a page over plain HTTP.
+
+    Returns None when the response is not HTML or the page needs JavaScript, the caller then falls back to the browser.
+    '''
+    headers={'User-Agent':user_agent} if user_agent else {}
+    if cookies:
+        headers['Cookie']='; '.join(f'{cookie.get("name")}={cookie.get("value")}' for cookie in cookies)
+    try:
+        response=await get_client().get(url,headers=headers)
+    except httpx.HTTPError:
+        return None
+    if response.status_code>=400 or 'text/html' not in response.headers.get('content-type',''):
+        return None
+    if needs_javascript(BeautifulSoup(response.text,'html.parser')):
+        return None
+    return response.text
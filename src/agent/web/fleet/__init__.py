@@ -0,0 +1,104 @@
+from src.agent.web.context.config import ContextConfig
+from src.agent.web.browser import Browser,BrowserConfig
+from src.agent.web.fleet.views import FleetMember
+from src.agent.web.context import Context
+from dataclasses import replace
+from src.trace import Tracer
+import asyncio
+import os
+
+class BrowserFleet:
+    '''
+    Runs several browser processes and spreads contexts across them by load.
+
+    Every member gets its own Playwright driver and debugging port, so sessions on one machine use all
+    cores. A monitor task health-checks the members and restarts crashed ones, the contexts they hosted
+    reopen their session on the restarted browser on next use.
+    '''
+    def __init__(self,config:BrowserConfig=None,size:int=None,health_check_interval:float=5,max_restarts:int=3):
+        self.config=config if config else BrowserConfig()
+        if self.config.user_data_dir is not None or self.config.browser_instance_dir is not None:
+            raise ValueError('A browser fleet cannot share a persistent user data directory between processes.')
+        self.size=size or os.cpu_count() or 1
+        self.health_check_interval=health_check_interval
+        self.max_restarts=max_restarts
+        self.members:list[FleetMember]=[]
+        self.monitor_task:asyncio.Task=None
+        self.lock=asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def member_config(self,index:int)->BrowserConfig:
+        if self.config.remote_debugging_port is None:
+            return self.config
+        return replace(self.config,remote_debugging_port=self.config.remote_debugging_port+index)
+
+    async def start(self):
+        self.members=[FleetMember(browser=Browser(config=self.member_config(index))) for index in range(self.size)]
+        await asyncio.gather(*[self.launch(member) for member in self.members])
+        self.monitor_task=asyncio.create_task(self.monitor())
+
+    async def launch(self,member:FleetMember):
+        try:
+            await member.browser.init_browser()
+        except Exception as e:
+            print(f'Browser failed to launch: {e}')
+
+    def is_healthy(self,member:FleetMember)->bool:
+        # Connection state only, a context's watchdog may already have relaunched the browser
+        playwright_browser=member.browser.playwright_browser
+        return playwright_browser is not None and playwright_browser.is_connected()
+
+    async def restart(self,member:FleetMember):
+        '''Relaunch a crashed browser, its contexts drop their dead session and reopen one lazily.'''
+        member.restarts+=1
+        # Through reset_session, so the tab registry and network activity do not keep the pages of the dead browser
+        await asyncio.gather(*[context.reset_session() for context in list(member.contexts)])
+        try:
+            await member.browser.relaunch()
+        except Exception as e:
+            print(f'Browser failed to launch: {e}')
+
+    async def monitor(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for member in self.members:
+                if self.is_healthy(member) or member.restarts>=self.max_restarts:
+                    continue
+                print(f'Restarting browser on port {member.browser.debugging_port} (restart {member.restarts+1}/{self.max_restarts})')
+                await self.restart(member)
+
+    async def acquire_context(self,config:ContextConfig=None,tracer:Tracer=None)->Context:
+        '''Create a context on the healthy browser hosting the fewest contexts.'''
+        async with self.lock:
+            members=[member for member in self.members if self.is_healthy(member)]
+            if not members:
+                raise RuntimeError('No healthy browser available in the fleet.')
+            member=min(members,key=lambda member:member.load)
+            context=Context(browser=member.browser,config=config or ContextConfig(),tracer=tracer)
+            member.contexts.add(context)
+        return context
+
+    async def release_context(self,context:Context):
+        await context.close_session()
+        for member in self.members:
+            member.contexts.discard(context)
+
+    def stats(self)->list[dict]:
+        return [{'port':member.browser.debugging_port,'contexts':member.load,'healthy':self.is_healthy(member),'restarts':member.restarts} for member in self.members]
+
+    async def close(self):
+        if self.monitor_task is not None:
+            self.monitor_task.cancel()
+            self.monitor_task=None
+        for member in self.members:
+            for context in list(member.contexts):
+                await context.close_session()
+            member.contexts.clear()
+        await asyncio.gather(*[member.browser.close_browser() for member in self.members])
+        self.members=[]
@@ -0,0 +1,13 @@
+from src.agent.web.browser import Browser
+from dataclasses import dataclass,field
+from typing import Any
+
+@dataclass
+class FleetMember:
+    browser:Browser
+    contexts:set[Any]=field(default_factory=set)
+    restarts:int=0
+
+    @property
+    def load(self)->int:
+        return len(self.contexts)
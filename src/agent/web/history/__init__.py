@@ -1,5 +1,6 @@
 from src.agent.web.history.views import DOMHistoryElementNode, HashElement
-from src.agent.web.dom.views import DOMElementNode
+from src.agent.web.dom.views import DOMElementNode,ScrollElementNode
+from urllib.parse import urldefrag
 from hashlib import sha256
 
 class History:
@@ -12,8 +13,16 @@ class History:
         hash_history_element=self.hash_element(history_element)
         return hash_dom_element==hash_history_element
 
-    def hash_element(self,element:DOMElementNode|DOMHistoryElementNode):
+    def hash_element(self,element:DOMElementNode|ScrollElementNode|DOMHistoryElementNode):
         element:dict=element.to_dict()
         attributes=sha256(str(element.get('attributes')).encode()).hexdigest()
         xpath=sha256(str(element.get('xpath')).encode()).hexdigest()
         return HashElement(attributes=attributes,xpath=xpath)
+
+    def hash_page(self,url:str,elements:list[DOMElementNode|ScrollElementNode])->str:
+        '''Fingerprint of a page from its url and the ordered hashes of its indexed elements, equal fingerprints address the same element under the same index.'''
+        digest=sha256(urldefrag(url or '').url.encode())
+        for element in elements:
+            hash_element=self.hash_element(element)
+            digest.update(f'{hash_element.attributes}:{hash_element.xpath}'.encode())
+        return digest.hexdigest()
@@ -0,0 +1,73 @@
+from src.agent.web.replay.views import ReplayStep,Trajectory
+from src.agent.web.context.views import BrowserState
+from src.agent.web.history import History
+from pathlib import Path
+import json
+import re
+
+class Replay:
+    '''
+    Records the (page fingerprint, action) sequence of successful runs per task template and replays it on later runs.
+
+    A recorded step is replayed only while the live page fingerprint matches the recorded one, the first
+    divergence hands control back to the LLM for the rest of the run.
+    '''
+    def __init__(self,path:str='./replay_data/trajectories.json'):
+        self.path=Path(path)
+        self.history=History()
+        self.trajectories:dict[str,Trajectory]=self.load()
+        self.template:str=None
+        self.replaying:list[ReplayStep]=[]
+        self.recording:list[ReplayStep]=[]
+
+    def load(self)->dict[str,Trajectory]:
+        if not self.path.exists():
+            return {}
+        with open(self.path,'r',encoding='utf-8') as f:
+            trajectories=json.load(f)
+        return {template:Trajectory.model_validate(trajectory) for template,trajectory in trajectories.items()}
+
+    def template_key(self,input:str)->str:
+        '''Normalize the task into its template, override to group tasks that differ only in their parameters.'''
+        return re.sub(r'\s+',' ',input).strip().lower()
+
+    def start(self,input:str):
+        self.template=self.template_key(input)
+        trajectory=self.trajectories.get(self.template)
+        self.replaying=list(trajectory.steps) if trajectory else []
+        self.recording=[]
+
+    def fingerprint(self,browser_state:BrowserState|None)->str:
+        if browser_state is None or browser_state.current_tab is None:
+            return self.history.hash_page(url='',elements=[])
+        dom_state=browser_state.dom_state
+        elements=list(dom_state.selector_map.values()) if dom_state else []
+        return self.history.hash_page(url=browser_state.current_tab.url,elements=elements)
+
+    def next_step(self,fingerprint:str)->dict|None:
+        '''Return the recorded decision for the current page, or None once the run diverged from the recording.'''
+        if not self.replaying:
+            return None
+        step=self.replaying[0]
+        if step.fingerprint!=fingerprint:
+            self.replaying=[]
+            return None
+        self.replaying.pop(0)
+        return step.agent_data
+
+    def record(self,fingerprint:str,agent_data:dict):
+        if self.template is None:
+            return None
+        self.recording.append(ReplayStep(fingerprint=fingerprint,agent_data=agent_data))
+
+    def save(self):
+        '''Store the recorded steps as the trajectory of the current template, called once the task succeeded.'''
+        if self.template is None or not self.recording:
+            return None
+        self.trajectories[self.template]=Trajectory(template=self.template,steps=self.recording)
+        self.path.parent.mkdir(parents=True,exist_ok=True)
+        temp_path=self.path.with_suffix('.tmp')
+        with open(temp_path,'w',encoding='utf-8') as f:
+            json.dump({template:trajectory.model_dump() for template,trajectory in self.trajectories.items()},f,indent=2)
+        temp_path.replace(self.path)
+        self.template=None
@@ -0,0 +1,9 @@
+from pydantic import BaseModel,Field
+
+class ReplayStep(BaseModel):
+    fingerprint:str=Field(...,description='Fingerprint of the page the action was taken on')
+    agent_data:dict=Field(...,description='The parsed LLM decision (Memory, Evaluate, Thought, Action Name, Action Input)')
+
+class Trajectory(BaseModel):
+    template:str=Field(...,description='The task template the trajectory was recorded for')
+    steps:list[ReplayStep]=Field(default_factory=list)
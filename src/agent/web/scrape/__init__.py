@@ -0,0 +1,201 @@
+from src.agent.web.fetch import fetch_html
+from markdownify import MarkdownConverter
+from bs4 import BeautifulSoup,Tag
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+from hashlib import sha256
+import asyncio
+import math
+import re
+
+if TYPE_CHECKING:
+    from src.agent.web.context import Context
+
+# Tags that never carry readable content
+REMOVED_TAGS=['script','style','noscript','template','svg','canvas','iframe','object','embed','link','meta','button','select','input','textarea']
+
+# Page chrome that sits around the main content
+BOILERPLATE_TAGS=['nav','footer','aside','dialog']
+
+UNLIKELY_CANDIDATES=re.compile(r'banner|breadcrumb|combx|comment|community|cookie|consent|disqus|extra|foot|header|legends|menu|modal|nav|newsletter|popup|promo|related|remark|replies|rss|share|shoutbox|sidebar|skyscraper|social|sponsor|subscribe|ad-|ads|advert|pagination|pager',re.I)
+MAYBE_CANDIDATES=re.compile(r'and|article|body|column|content|main|shadow|post|entry',re.I)
+POSITIVE=re.compile(r'article|body|content|entry|hentry|main|page|post|text|blog|story',re.I)
+NEGATIVE=re.compile(r'hidden|banner|combx|comment|contact|foot|footer|footnote|masthead|media|meta|outbrain|promo|related|scroll|share|shoutbox|sidebar|skyscraper|sponsor|shopping|tags|tool|widget',re.I)
+
+SCORED_TAGS=['p','pre','td','blockquote','li','h2','h3']
+MIN_PARAGRAPH_LENGTH=25
+MIN_MAIN_LENGTH=200
+
+TOKEN_BUDGET=4000
+CHARS_PER_TOKEN=4
+
+BULK_TOKEN_BUDGET=8000
+BULK_CONCURRENCY=5
+
+def estimate_tokens(text:str)->int:
+    return math.ceil(len(text)/CHARS_PER_TOKEN)
+
+def class_and_id(tag:Tag)->str:
+    return ' '.join(tag.get('class') or [])+' '+(tag.get('id') or '')
+
+def is_hidden(tag:Tag)->bool:
+    style=(tag.get('style') or '').replace(' ','').lower()
+    return tag.has_attr('hidden') or tag.get('aria-hidden')=='true' or 'display:none' in style or 'visibility:hidden' in style
+
+def link_density(tag:Tag)->float:
+    text_length=len(tag.get_text(' ',strip=True))
+    if not text_length:
+        return 1
+    link_length=sum(len(link.get_text(' ',strip=True)) for link in tag.find_all('a'))
+    return link_length/text_length
+
+def clean(soup:BeautifulSoup):
+    '''Strip scripts, hidden nodes and page chrome in place.'''
+    for tag in soup(REMOVED_TAGS+BOILERPLATE_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(True):
+        if tag.decomposed or tag.name in ('html','body','main','article'):
+            continue
+        if is_hidden(tag):
+            tag.decompose()
+            continue
+        if tag.name=='header' and tag.find_parent(['article','main']) is None:
+            tag.decompose()
+            continue
+        names=class_and_id(tag)
+        if UNLIKELY_CANDIDATES.search(names) and not MAYBE_CANDIDATES.search(names) and link_density(tag)>0.3:
+            tag.decompose()
+
+def class_weight(tag:Tag)->int:
+    names=class_and_id(tag)
+    return (25 if POSITIVE.search(names) else 0)-(25 if NEGATIVE.search(names) else 0)
+
+def find_main_content(soup:BeautifulSoup)->Tag:
+    '''
+    Pick the element holding the main content, readability style.
+
+    An explicit main landmark wins when it has enough text, otherwise every paragraph adds a score for its
+    length and commas to its parent and half of it to its grandparent, and the best container after a link
+    density penalty is the main content.
+    '''
+    body=soup.body or soup
+    landmarks=soup.select('main,[role=main],article')
+    if len(landmarks)==1 and len(landmarks[0].get_text(' ',strip=True))>=MIN_MAIN_LENGTH:
+        return landmarks[0]
+    scores:dict[int,float]={}
+    candidates:dict[int,Tag]={}
+    for paragraph in body.find_all(SCORED_TAGS):
+        text=paragraph.get_text(' ',strip=True)
+        if len(text)<MIN_PARAGRAPH_LENGTH:
+            continue
+        score=1+text.count(',')+min(len(text)//100,3)
+        for ancestor,share in ((paragraph.parent,1),(paragraph.parent.parent if paragraph.parent else None,0.5)):
+            if not isinstance(ancestor,Tag) or ancestor.name in ('html','[document]'):
+                continue
+            if id(ancestor) not in candidates:
+                candidates[id(ancestor)]=ancestor
+                scores[id(ancestor)]=class_weight(ancestor)+(5 if ancestor.name in ('div','article','main','section') else 0)
+            scores[id(ancestor)]+=score*share
+    if not candidates:
+        return body
+    best=max(candidates,key=lambda key:scores[key]*(1-link_density(candidates[key])))
+    return candidates[best]
+
+def html_to_markdown(html:str)->str:
+    '''Markdown of the main content of a page, without navigation, scripts, inline graphics and other chrome.'''
+    soup=BeautifulSoup(html,'html.parser')
+    title=soup.title.get_text(strip=True) if soup.title else ''
+    clean(soup)
+    main=find_main_content(soup)
+    markdown=MarkdownConverter(heading_style='ATX').convert_soup(main)
+    # Images inlined as data URIs are pure noise to the LLM
+    markdown=re.sub(r'!\[([^\]]*)\]\(data:[^)]*\)',r'\1',markdown)
+    markdown=re.sub(r'\n\s*\n+','\n\n',markdown).strip()
+    if title and title not in markdown[:len(title)+10]:
+        markdown=f'# {title}\n\n{markdown}'
+    return markdown
+
+def chunk_markdown(markdown:str,token_budget:int=TOKEN_BUDGET)->list[str]:
+    '''Split markdown into parts within the token budget, on block boundaries wherever a block fits.'''
+    max_length=token_budget*CHARS_PER_TOKEN
+    chunks,current=[],''
+    for block in markdown.split('\n\n'):
+        pieces=[block[start:start+max_length] for start in range(0,len(block),max_length)] or ['']
+        for piece in pieces:
+            if current and len(current)+len(piece)+2>max_length:
+                chunks.append(current)
+                current=''
+            current=f'{current}\n\n{piece}' if current else piece
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
+
+class ScrapeCache:
+    '''LRU of chunked page content keyed by URL and a hash of the HTML, a changed page gets a new entry.'''
+    def __init__(self,max_entries:int=64):
+        self.max_entries=max_entries
+        self.entries:OrderedDict[tuple[str,str,int],list[str]]=OrderedDict()
+        self.hits=0
+        self.misses=0
+
+    def key(self,url:str,html:str,token_budget:int)->tuple[str,str,int]:
+        return (url,sha256(html.encode('utf-8',errors='ignore')).hexdigest(),token_budget)
+
+    def get_chunks(self,url:str,html:str,token_budget:int=TOKEN_BUDGET)->list[str]:
+        key=self.key(url,html,token_budget)
+        chunks=self.entries.get(key)
+        if chunks is not None:
+            self.hits+=1
+            self.entries.move_to_end(key)
+            return chunks
+        self.misses+=1
+        chunks=chunk_markdown(html_to_markdown(html),token_budget)
+        self.entries[key]=chunks
+        if len(self.entries)>self.max_entries:
+            self.entries.popitem(last=False)
+        return chunks
+
+cache=ScrapeCache()
+
+async def load_html(context:'Context',url:str)->tuple[str,str]:
+    '''HTML of a page over plain HTTP when it is static, otherwise from a background tab that is closed afterwards.'''
+    session=await context.get_session()
+    cookies=await session.context.cookies(url)
+    html=await fetch_html(url,user_agent=context.config.user_agent,cookies=cookies)
+    if html is not None:
+        return html,'http'
+    page=await session.context.new_page()
+    try:
+        await page.goto(url=url,wait_until='domcontentloaded')
+        await context.wait_for_stable_page(page)
+        return await page.content(),'tab'
+    finally:
+        await page.close()
+
+async def scrape_pages(context:'Context',urls:list[str],token_budget:int=BULK_TOKEN_BUDGET,concurrency:int=BULK_CONCURRENCY)->list[tuple[str,str]]:
+    '''
+    Main content of several pages loaded concurrently, each cut to an equal share of the token budget.
+
+    Returns (url, content) pairs in the order of the urls, a page that failed to load carries the error instead.
+    '''
+    semaphore=asyncio.Semaphore(concurrency)
+    share=max(token_budget//max(len(urls),1),1)
+    async def scrape(url:str)->tuple[str,str]:
+        async with semaphore:
+            with context.tracer.span('scrape.page',url=url) as span:
+                try:
+                    html,source=await load_html(context,url)
+                except Exception as e:
+                    span.attributes['error']=type(e).__name__
+                    return url,f'Failed to load the page: {e}'
+                chunks=cache.get_chunks(url,html,share)
+                span.attributes['source']=source
+                span.attributes['parts']=len(chunks)
+        more=f'\n\n(Part 1 of {len(chunks)}, read the rest with Fetch Tool or GoTo Tool + Scrape Tool.)' if len(chunks)>1 else ''
+        return url,chunks[0]+more
+    session=await context.get_session()
+    try:
+        return await asyncio.gather(*[scrape(url) for url in urls])
+    finally:
+        # Opening background tabs can steal the focus in a headed browser
+        await session.current_page.bring_to_front()
@@ -7,6 +7,7 @@ from operator import add
 class AgentState(TypedDict):
     input:str
     output:str
+    iteration:int
     agent_data:dict
     prev_observation:str
     browser_state:BrowserState|None
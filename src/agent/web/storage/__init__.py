@@ -0,0 +1,63 @@
+from cryptography.fernet import Fernet,InvalidToken
+from hashlib import sha256
+from pathlib import Path
+from time import time
+import json
+import os
+
+class StorageStateCache:
+    '''
+    Encrypted on-disk cache of Playwright storage states (cookies and localStorage), one snapshot per site or account key.
+
+    The Fernet key is read from the `STORAGE_STATE_KEY` environment variable, otherwise it is generated once
+    and kept next to the snapshots with owner-only permissions.
+    '''
+    def __init__(self,path:str='./storage_state',key:str=None,max_age:float=7*24*60*60):
+        self.path=Path(path)
+        self.path.mkdir(parents=True,exist_ok=True)
+        self.max_age=max_age
+        self.fernet=Fernet(key or os.getenv('STORAGE_STATE_KEY') or self.load_key())
+
+    def load_key(self)->bytes:
+        key_path=self.path.joinpath('.key')
+        if key_path.exists():
+            return key_path.read_bytes()
+        key=Fernet.generate_key()
+        # Created with owner-only permissions, the key is never readable by others even for a moment
+        try:
+            fd=os.open(key_path,os.O_WRONLY|os.O_CREAT|os.O_EXCL,0o600)
+        except FileExistsError:
+            # Another process created the key in the meantime
+            return key_path.read_bytes()
+        with os.fdopen(fd,'wb') as f:
+            f.write(key)
+        return key
+
+    def snapshot_path(self,key:str)->Path:
+        return self.path.joinpath(f'{sha256(key.encode()).hexdigest()}.bin')
+
+    def save(self,key:str,storage_state:dict):
+        snapshot={'saved_at':time(),'storage_state':storage_state}
+        self.snapshot_path(key).write_bytes(self.fernet.encrypt(json.dumps(snapshot).encode()))
+
+    def load(self,key:str)->dict|None:
+        '''Return the storage state saved under the key, or None if it is missing, unreadable, too old or fully expired.'''
+        path=self.snapshot_path(key)
+        if not path.exists():
+            return None
+        try:
+            snapshot=json.loads(self.fernet.decrypt(path.read_bytes()))
+        except (InvalidToken,ValueError):
+            return None
+        if time()-snapshot.get('saved_at',0)>self.max_age:
+            return None
+        storage_state=snapshot.get('storage_state')
+        now=time()
+        # Drop expired cookies, session cookies have expires=-1
+        cookies=[cookie for cookie in storage_state.get('cookies',[]) if cookie.get('expires',-1)<0 or cookie.get('expires')>now]
+        if storage_state.get('cookies') and not cookies:
+            return None
+        return {**storage_state,'cookies':cookies}
+
+    def delete(self,key:str):
+        self.snapshot_path(key).unlink(missing_ok=True)
@@ -1,35 +1,68 @@
-from src.agent.web.tools.views import Click,Type,Wait,Scroll,GoTo,Back,Key,Download,Scrape,Tab,Upload,Menu,Done,Forward,HumanInput,Script
+from src.agent.web.tools.views import Click,Type,Wait,Scroll,GoTo,Back,Key,Download,Scrape,Tab,Upload,Menu,Done,Forward,HumanInput,Script,Fetch,BulkScrape,ScrollUntil,Extract,Form
+from src.agent.web.fetch import fetch_html
+from src.agent.web.download import Downloader
+from src.agent.web.extract import extract_records
+from src.agent.web.scrape import cache as scrape_cache,scrape_pages
 from src.agent.web.context import Context
-from markdownify import markdownify
 from typing import Literal,Optional
 from termcolor import colored
 from src.tool import Tool
 from asyncio import sleep
 from pathlib import Path
+from datetime import datetime
 from os import getcwd
-import httpx
 
-@Tool('Done Tool',params=Done)
+async def session_identity(context:Context=None,**kwargs)->str:
+    '''The browser context whose cookies a result was loaded with, so one account never gets the pages of another.'''
+    return context.session.id if context.session is not None else 'anonymous'
+
+async def file_fingerprint(filename:str=None,context:Context=None,**kwargs)->str:
+    '''Size and modification time of the target file, so a deleted or changed download is fetched again.'''
+    path=Path(context.browser.config.downloads_dir).joinpath(filename)
+    if not path.exists():
+        return 'missing'
+    stat=path.stat()
+    return f'{stat.st_size} {stat.st_mtime_ns}'
+
+async def stop_script(context:Context=None,**kwargs):
+    '''Terminate the JavaScript still running on the current page, a script stuck in a loop blocks the page for good.'''
+    if context.session is None or context.session.current_page is None:
+        return None
+    page=context.session.current_page
+    # Only Chromium exposes this, a page of another browser stays blocked until the watchdog replaces it
+    cdp=await page.context.new_cdp_session(page)
+    try:
+        await cdp.send('Runtime.terminateExecution')
+    finally:
+        await cdp.detach()
+
+@Tool('Done Tool',params=Done,mutates_page=False)
 async def done_tool(content:str,context:Context=None):
     '''Indicates that the current task has been completed successfully. Use this to signal completion and provide a summary of what was accomplished.'''
     return content
 
 @Tool('Click Tool',params=Click)
 async def click_tool(index:int,context:Context=None):
-    '''Clicks on interactive elements like buttons, links, checkboxes, radio buttons, tabs, or any clickable UI component. Automatically scrolls the element into view if needed and handles hidden elements.'''
-    page=await context.get_current_page()
-    await page.wait_for_load_state('load')
+    '''Clicks on interactive elements like buttons, links, checkboxes, radio buttons, tabs, or any clickable UI component. Automatically scrolls the element into view if needed and handles hidden elements. Reports whether the click navigated, opened a new tab or changed the page.'''
     element=await context.get_element_by_index(index=index)
     handle=await context.get_handle_by_xpath(element.xpath)
-    is_hidden=await handle.is_hidden()
-    if not is_hidden:
-        await handle.scroll_into_view_if_needed()
-    await handle.click(force=True)
-    return f'Clicked on the element at label {index}'
+    outcome,new_page=await context.click_element(handle)
+    if outcome=='popup':
+        session=await context.get_session()
+        # Follow the new tab like a user would, the old one stays open in the tab list
+        session.current_page=new_page
+        await new_page.bring_to_front()
+        return f'Clicked on the element at label {index}, it opened a new tab ({session.context.pages.index(new_page)}) and switched to it.'
+    if outcome=='navigation':
+        page=await context.get_current_page()
+        return f'Clicked on the element at label {index}, it navigated to {page.url}'
+    if outcome=='mutation':
+        return f'Clicked on the element at label {index}, the page content changed.'
+    return f'Clicked on the element at label {index}, no visible change followed.'
 
 @Tool('Type Tool',params=Type)
 async def type_tool(index:int,text:str,clear:Literal['True','False']='False',press_enter:Literal['True','False']='False',context:Context=None):
-    '''Types text into input fields, text areas, search boxes, or any editable element. Can optionally clear existing content before typing. Includes natural typing delay for better compatibility.'''
+    '''Types text into input fields, text areas, search boxes, or any editable element. Can optionally clear existing content before typing. Fields that only react to real key presses, like autocomplete boxes, are typed into character by character.'''
     page=await context.get_current_page()
     element=await context.get_element_by_index(index=index)
     handle=await context.get_handle_by_xpath(element.xpath)
@@ -37,16 +70,12 @@ async def type_tool(index:int,text:str,clear:Literal['True','False']='False',pre
     is_hidden=await handle.is_hidden()
     if not is_hidden:
         await handle.scroll_into_view_if_needed()
-    await handle.click(force=True)
-    if clear=='True':
-        await page.keyboard.press('Control+A')
-        await page.keyboard.press('Backspace')
-    await page.keyboard.type(text,delay=80)
+    await context.fill_element(handle,text,clear=clear=='True')
     if press_enter=='True':
         await page.keyboard.press('Enter')
     return f'Typed {text} in element at label {index}'
 
-@Tool('Wait Tool',params=Wait)
+@Tool('Wait Tool',params=Wait,timeout=60)
 async def wait_tool(time:int,context:Context=None):
     '''Pauses execution for a specified number of seconds. Use this to wait for page loading, animations to complete, or content to appear after an action.'''
     await sleep(time)
@@ -67,13 +96,11 @@ async def scroll_tool(direction:Literal['up','down']='up',index:int=None,amount:
             raise ValueError('Invalid direction')
         return f'Scrolled {direction} inside the element at label {index} by {amount}'
     else:
-        scroll_y_before = await context.execute_script(page,"() => window.scrollY")
-        max_scroll_y = await context.execute_script(page,"() => document.documentElement.scrollHeight - window.innerHeight")
-        min_scroll_y = await context.execute_script(page,"() => document.documentElement.scrollHeight")
+        scroll_y_before,max_scroll_y = await context.execute_script(page,"() => [window.scrollY, document.documentElement.scrollHeight - window.innerHeight]")
         # Check if scrolling is possible
         if scroll_y_before >= max_scroll_y and direction == 'down':
             return "Already at the bottom, cannot scroll further."
-        elif scroll_y_before == min_scroll_y and direction == 'up':
+        elif scroll_y_before <= 0 and direction == 'up':
             return "Already at the top, cannot scroll further."
         if direction=='up':
             if amount is None:
@@ -95,12 +122,46 @@ async def scroll_tool(direction:Literal['up','down']='up',index:int=None,amount:
         amount=amount if amount else 'one page'
         return f'Scrolled {direction} by {amount}'
 
+@Tool('Scroll Until Tool',params=ScrollUntil)
+async def scroll_until_tool(text:str=None,selector:str=None,index:int=None,item_selector:str=None,max_items:int=50,max_scrolls:int=30,context:Context=None):
+    '''Keeps scrolling the webpage or a scrollable container until a text or element shows up, the end is reached or enough items are collected, all in a single step. Give item_selector to gather the entries of long or virtualized lists along the way. Use this instead of repeated Scroll Tool calls when looking for something further down.'''
+    if text is None and selector is None and item_selector is None:
+        raise ValueError('Provide the text or selector to look for, or the item_selector to collect.')
+    handle=None
+    if index is not None:
+        element=await context.get_element_by_index(index=index)
+        handle=await context.get_handle_by_xpath(xpath=element.xpath)
+    result=await context.scroll_until(handle,text=text,selector=selector,item_selector=item_selector,max_items=max_items,max_scrolls=max_scrolls)
+    target=' '.join(part for part in (f'"{text}"' if text else None,selector) if part)
+    if result.get('found') is not None:
+        summary=f'Found {target} after {result.get("scrolls")} scroll(s) and scrolled it into view: {result.get("found")}'
+    elif target:
+        reason='reached the end' if result.get('end') else f'stopped after {result.get("scrolls")} scroll(s)'
+        summary=f'Did not find {target}, {reason}.'
+    else:
+        summary=f'Scrolled {result.get("scrolls")} time(s).'
+    items=result.get('items')
+    if items:
+        summary+=f'\nCollected {len(items)} item(s):\n'+'\n'.join(f'- {item}' for item in items)
+    return summary
+
+@Tool('Extract Tool',params=Extract)
+async def extract_tool(selector:str=None,next_selector:str=None,max_pages:int=1,format:Literal['csv','jsonl']='csv',filename:str=None,context:Context=None):
+    '''Extracts a table or a repeated list (search results, product cards, feed items) from the current webpage into a CSV or JSON Lines file in one pass, optionally following the next page control. Returns the columns and a few sample rows instead of the full data, use it for large tabular data.'''
+    filename=filename or f'extract_{datetime.now().strftime("%Y_%m_%d_%H_%M_%S")}.{format}'
+    path=Path(context.browser.config.downloads_dir).joinpath(filename)
+    with context.tracer.span('extract',max_pages=max_pages) as span:
+        extraction=await extract_records(context,path,selector=selector,next_selector=next_selector,max_pages=max_pages,format=format)
+        span.attributes['rows']=extraction.rows
+        span.attributes['pages']=extraction.pages
+    return extraction.to_string()
+
 @Tool('GoTo Tool',params=GoTo)
 async def goto_tool(url:str,context:Context=None):
-    '''Navigates directly to a specified URL in the current tab. Supports HTTP/HTTPS URLs and waits for the DOM content to load before proceeding.'''
+    '''Navigates directly to a specified URL in the current tab. Supports HTTP/HTTPS URLs and waits for the page to settle before proceeding.'''
     page=await context.get_current_page()
     await page.goto(url=url,wait_until='domcontentloaded')
-    await page.wait_for_timeout(2.5*1000)
+    await context.wait_for_stable_page(page)
     return f'Navigated to {url}'
 
 @Tool('Back Tool',params=Back)
@@ -128,26 +189,63 @@ async def key_tool(keys:str,times:int=1,context:Context=None):
         await page.keyboard.press(keys)
     return f'Pressed {keys}'
 
-@Tool('Download Tool',params=Download)
+@Tool('Download Tool',params=Download,mutates_page=False,parallel_safe=True,cache_ttl=24*3600,cache_context=file_fingerprint,timeout=30*60)
 async def download_tool(url:str=None,filename:str=None,context:Context=None):
     '''Downloads files from the internet (PDFs, images, videos, audio, documents) and saves them to the system's downloads directory. Handles various file types and formats.'''
     folder_path=Path(context.browser.config.downloads_dir)
-    async with httpx.AsyncClient() as client:
-        response=await client.get(url)
     path=folder_path.joinpath(filename)
-    with open(path,'wb') as f:
-        async for chunk in response.aiter_bytes():
-            f.write(chunk)
-    return f'Downloaded {filename} from {url} and saved it to {path}'
-
-@Tool('Scrape Tool',params=Scrape)
-async def scrape_tool(context:Context=None):
-    '''Extracts and returns the main content from the current webpage. Can output in markdown format (preserving links and structure). Filters out navigation, ads, and other non-essential content.'''
+    headers={'User-Agent':context.config.user_agent}
+    # Files behind a login need the browser's cookies
+    cookies=await context.session.context.cookies(url) if context.session is not None else None
+    if cookies:
+        headers['Cookie']='; '.join(f'{cookie.get("name")}={cookie.get("value")}' for cookie in cookies)
+    on_progress=lambda progress:print(colored(f'Downloading {filename}: {progress.to_string()}',color='light_blue'))
+    with context.tracer.span('download',url=url) as span:
+        progress=await Downloader(url,path,headers=headers,on_progress=on_progress).download()
+        span.attributes['bytes']=progress.downloaded
+        span.attributes['resumed_bytes']=progress.resumed
+        span.attributes['throughput']=progress.throughput
+    return f'Downloaded {filename} from {url} and saved it to {path} ({progress.to_string()})'
+
+@Tool('Scrape Tool',params=Scrape,mutates_page=False,parallel_safe=True)
+async def scrape_tool(part:int=1,context:Context=None):
+    '''Extracts and returns the main content from the current webpage. Can output in markdown format (preserving links and structure). Filters out navigation, ads, and other non-essential content. Long pages are returned in parts, ask for the next part to keep reading.'''
     page=await context.get_current_page()
     await page.wait_for_load_state('domcontentloaded')
     html=await page.content()
-    content= markdownify(html)
-    return f'Scraped the contents of the entire webpage:\n{content}'
+    chunks=scrape_cache.get_chunks(page.url,html)
+    if not 1<=part<=len(chunks):
+        return f'The main content of this webpage has {len(chunks)} part(s), part {part} does not exist.'
+    more=f' Scrape Tool with part={part+1} returns the next part.' if part<len(chunks) else ''
+    return f'Scraped part {part} of {len(chunks)} of the main content of the webpage.{more}\n{chunks[part-1]}'
+
+@Tool('Fetch Tool',params=Fetch)
+async def fetch_tool(url:str,part:int=1,context:Context=None):
+    '''Reads the main content of a URL as markdown. Static pages are fetched over plain HTTP without opening them in the browser, pages that need JavaScript are opened in the current tab instead. Long pages are returned in parts, ask for the next part to keep reading. Prefer this over GoTo Tool + Scrape Tool when the page only has to be read.'''
+    # Reuse the browser's cookies when a session is already open, never launch one just for them
+    cookies=await context.session.context.cookies(url) if context.session is not None else None
+    html=await fetch_html(url,user_agent=context.config.user_agent,cookies=cookies)
+    if html is not None:
+        source='Fetched the main content of {url} without the browser'
+    else:
+        page=await context.get_current_page()
+        await page.goto(url=url,wait_until='domcontentloaded')
+        await context.wait_for_stable_page(page)
+        html=await page.content()
+        source='Navigated to {url} and scraped the main content of the webpage'
+    chunks=scrape_cache.get_chunks(url,html)
+    if not 1<=part<=len(chunks):
+        return f'The main content of {url} has {len(chunks)} part(s), part {part} does not exist.'
+    more=f' Fetch Tool with part={part+1} returns the next part.' if part<len(chunks) else ''
+    return f'{source.format(url=url)}, part {part} of {len(chunks)}.{more}\n{chunks[part-1]}'
+
+@Tool('Bulk Scrape Tool',params=BulkScrape,mutates_page=False,parallel_safe=True,max_concurrency=1,cache_ttl=900,cache_context=session_identity,cache_persist=False)
+async def bulk_scrape_tool(urls:list[str],context:Context=None):
+    '''Reads the main content of several pages at once, e.g. all the results of a search. Pages are loaded concurrently over plain HTTP or in background tabs without leaving the current tab, and each page gets an equal share of the result. Prefer this over visiting the pages one by one.'''
+    with context.tracer.span('bulk_scrape',count=len(urls)):
+        pages=await scrape_pages(context,urls)
+    content='\n\n'.join(f'## [{index+1}] {url}\n{page_content}' for index,(url,page_content) in enumerate(pages))
+    return f'Scraped the main content of {len(pages)} webpages:\n{content}'
 
 @Tool('Tab Tool', params=Tab)
 async def tab_tool(mode: Literal['open', 'close', 'switch'], tab_index: Optional[int] = None, context: Context = None):
@@ -207,14 +305,23 @@ async def menu_tool(index:int,labels:list[str],context:Context=None):
     await handle.select_option(label=labels)
     return f'Opened context menu of element at label {index} and selected {", ".join(labels)}'
 
-@Tool("Script Tool",params=Script)
+@Tool('Form Tool',params=Form)
+async def form_tool(fields:dict[int,str|bool|list[str]],context:Context=None):
+    '''Fills a whole form in one step: text inputs, text areas, dropdowns, checkboxes and radio buttons at once, each addressed by its index/label. Reports the result per field. Prefer this over separate Type Tool and Menu Tool calls when several fields have to be filled; it does not submit the form.'''
+    with context.tracer.span('form',fields=len(fields)):
+        results=await context.fill_form(fields)
+    failed=sum(result.startswith('failed') for result in results.values())
+    report='\n'.join(f'- [{index}]: {result}' for index,result in results.items())
+    return f'Filled {len(results)-failed} of {len(results)} form fields:\n{report}'
+
+@Tool("Script Tool",params=Script,timeout=30,on_timeout=stop_script)
 async def script_tool(script:str,context:Context=None):
     '''Executes arbitrary JavaScript code on the page. Can be used to manipulate the DOM or trigger events or scrape data. Returns the result of the executed script.'''
     page=await context.get_current_page()
     result=await context.execute_script(page,script)
     return f"Result of the executed script: {result}"
 
-@Tool('Human Tool',params=HumanInput)
+@Tool('Human Tool',params=HumanInput,mutates_page=False)
 async def human_tool(prompt:str,context:Context=None):
     '''Requests human assistance when encountering challenges that require human intervention such as CAPTCHAs, OTP codes, complex decisions, or when explicitly asked to involve a human user.'''
     print(colored(f"Agent: {prompt}", color='cyan', attrs=['bold']))
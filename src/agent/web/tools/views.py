@@ -25,6 +25,21 @@ class Scroll(SharedBaseModel):
     index: int = Field(description="Index of specific scrollable element, if None then scrolls the entire page", examples=[0, 5, 12,None],default=None)
     amount: int = Field(description="Number of pixels to scroll, if None then scrolls by page/container height. Must required for scrollable container elements and the amount should be small", examples=[100, 25, 50],default=500)
 
+class ScrollUntil(SharedBaseModel):
+    text:str = Field(description="Text to scroll to, matched case-insensitively anywhere in the content",examples=["Contact us","Load more"],default=None)
+    selector:str = Field(description="CSS selector of the element to scroll to",examples=["#reviews","button.load-more"],default=None)
+    index:int = Field(description="Index of the scrollable container to scroll, if None then scrolls the entire page",examples=[0,5,None],default=None)
+    item_selector:str = Field(description="CSS selector of the list items to collect while scrolling, e.g. the rows of a feed or a virtualized list",examples=["article",".result-item","li.product"],default=None)
+    max_items:int = Field(description="Stop after collecting this many distinct items",examples=[20,50],default=50,ge=1,le=500)
+    max_scrolls:int = Field(description="Stop after this many scroll steps",examples=[10,30],default=30,ge=1,le=100)
+
+class Extract(SharedBaseModel):
+    selector:str = Field(description="CSS selector of the table or list container to extract, if None then the largest table or repeated list on the page is detected",examples=["#results","table.prices",None],default=None)
+    next_selector:str = Field(description="CSS selector of the next page link or button to follow for paginated data",examples=["a[rel=next]","button.next",None],default=None)
+    max_pages:int = Field(description="Maximum number of pages to extract when following the next page control",examples=[1,5],default=1,ge=1,le=50)
+    format:Literal['csv','jsonl'] = Field(description="File format of the extracted rows",examples=['csv','jsonl'],default='csv')
+    filename:str = Field(description="Filename to save the rows as in the downloads directory, if None then a timestamped name is used",examples=["products.csv",None],default=None)
+
 class GoTo(SharedBaseModel):
     url:str = Field(...,description="The complete URL to navigate to including protocol (http/https)",examples=["https://www.example.com","https://google.com/search?q=test"])
 
@@ -43,7 +58,14 @@ class Download(SharedBaseModel):
     filename:str=Field(...,description="Local filename to save the downloaded file as (include file extension)",examples=["document.pdf","image.jpg","data.xlsx"])
 
 class Scrape(SharedBaseModel):
-    pass
+    part:int = Field(description="Which part of the main content to return, long pages are split into parts and the result says how many there are",default=1,examples=[1,2])
+
+class BulkScrape(SharedBaseModel):
+    urls:list[str] = Field(...,description="Complete URLs of the pages to read together, e.g. the results of a search (at most 10)",examples=[["https://en.wikipedia.org/wiki/Web_browser","https://en.wikipedia.org/wiki/Web_crawler"]],max_length=10)
+
+class Fetch(SharedBaseModel):
+    url:str = Field(...,description="The complete URL of the page to read including protocol (http/https)",examples=["https://en.wikipedia.org/wiki/Web_browser","https://docs.python.org/3/"])
+    part:int = Field(description="Which part of the main content to return, long pages are split into parts and the result says how many there are",default=1,examples=[1,2])
 
 class Tab(SharedBaseModel):
     mode:Literal['open','close','switch'] = Field(...,description="Tab operation: 'open' creates new tab, 'close' closes current tab, 'switch' changes to existing tab",examples=['open','close','switch'])
@@ -57,6 +79,9 @@ class Menu(SharedBaseModel):
     index:int = Field(...,description="Index of the dropdown/select element to interact with",examples=[0])
     labels:list[str] = Field(...,description="List of visible option labels to select from the dropdown menu (supports single or multiple selection)",examples=[["BMW"],["Option 1","Option 2"]])
 
+class Form(SharedBaseModel):
+    fields:dict[int,str|bool|list[str]] = Field(...,description="Mapping of the index/label of each form field to its value: text for inputs and text areas, the option label (or a list of labels for multi-selects) for dropdowns, true/false for checkboxes and true for the radio button to pick",examples=[{"3":"Ada Lovelace","4":"ada@example.com","6":"United Kingdom","8":True}])
+
 class Script(SharedBaseModel):
     script:str = Field(...,description="The JavaScript code to execute in the current webpage to scrape data. Make sure the script is well-formatted",examples=["console.log('Hello, world!')"])
 
@@ -0,0 +1,150 @@
+from src.agent.web.watchdog.views import WatchState
+from playwright.async_api import Page,BrowserContext as PlaywrightContext
+from typing import TYPE_CHECKING,Awaitable,Callable,TypeVar
+from weakref import WeakKeyDictionary
+import asyncio
+
+if TYPE_CHECKING:
+    from src.agent.web.context import Context
+
+T=TypeVar('T')
+
+class WatchdogError(Exception):
+    '''An operation missed its deadline or the browser could not be recovered.'''
+
+class Watchdog:
+    '''
+    Puts deadlines on browser operations and recovers from hung or crashed pages and browsers.
+
+    A failure is a `crash` event of a page, a disconnect of the browser, or an operation missing its deadline
+    on a page that no longer answers a trivial evaluate within the heartbeat timeout. Recovery replaces the
+    page, or relaunches the browser and reopens the session, then navigates back to the last URL seen healthy
+    so the run continues on a working page.
+    '''
+    def __init__(self,action_timeout:float=45,observe_timeout:float=30,playwright_timeout:float=15,heartbeat_timeout:float=5,max_recoveries:int=3):
+        self.action_timeout=action_timeout
+        self.observe_timeout=observe_timeout
+        # Below the operation deadlines, so a stuck locator surfaces as a regular tool error first
+        self.playwright_timeout=playwright_timeout
+        self.heartbeat_timeout=heartbeat_timeout
+        self.max_recoveries=max_recoveries
+        # One state per Context, so a watchdog shared by the agents of a fleet recovers only the session that failed
+        self.states:WeakKeyDictionary['Context',WatchState]=WeakKeyDictionary()
+
+    def get_state(self,context:'Context')->WatchState:
+        state=self.states.get(context)
+        if state is None:
+            state=self.states[context]=WatchState()
+        return state
+
+    def watch(self,context:'Context'):
+        '''Hook the crash, close and disconnect events of the session, once per browser context.'''
+        session=context.session
+        state=self.get_state(context)
+        if session is None or session.context in state.watched:
+            return None
+        state.watched.add(session.context)
+        session.context.set_default_timeout(self.playwright_timeout*1000)
+        for page in session.context.pages:
+            page.on('crash',state.on_crash)
+        session.context.on('page',lambda page:page.on('crash',state.on_crash))
+        def on_close(closed_context:PlaywrightContext):
+            # Closed on purpose by a recovery or the end of the run once it is no longer the session's context
+            if context.session is not None and context.session.context is closed_context:
+                state.fail('Browser context closed')
+            state.watched.discard(closed_context)
+        session.context.on('close',on_close)
+        if session.context.browser is not None:
+            session.context.browser.on('disconnected',lambda _:state.fail('Browser disconnected'))
+
+    async def is_responsive(self,page:Page)->bool:
+        try:
+            await asyncio.wait_for(page.evaluate('1'),timeout=self.heartbeat_timeout)
+        except Exception:
+            return False
+        return True
+
+    async def guard(self,context:'Context',name:str,operation:Callable[[],Awaitable[T]],timeout:float=None,retries:int=0)->T:
+        '''
+        Run a browser operation under a deadline, racing it against crash and disconnect events.
+
+        A failure recovers the page or browser before returning. The result of an operation that finished
+        anyway is returned, otherwise the operation is retried `retries` times and then a WatchdogError raised.
+        '''
+        timeout=timeout or self.action_timeout
+        state=self.get_state(context)
+        for attempt in range(retries+1):
+            await context.get_session()
+            if state.failed.is_set():
+                # Failed between two operations, e.g. the browser died while the LLM was thinking
+                await self.recover(context)
+            self.watch(context)
+            task=asyncio.ensure_future(operation())
+            failure=asyncio.ensure_future(state.failed.wait())
+            done,_=await asyncio.wait({task,failure},timeout=timeout,return_when=asyncio.FIRST_COMPLETED)
+            failure.cancel()
+            if task in done and not state.failed.is_set():
+                result=task.result()
+                state.recoveries=0
+                state.last_url=self.current_url(context) or state.last_url
+                return result
+            if task in done:
+                error=f'{name} failed: {state.failure or task.exception()}'
+                await self.recover(context)
+                if task.exception() is None:
+                    return task.result()
+            else:
+                task.cancel()
+                error=state.failure or f'{name} exceeded its {timeout}s deadline'
+                page=context.session.current_page if context.session else None
+                if state.failed.is_set() or page is None or not await self.is_responsive(page):
+                    await self.recover(context)
+        raise WatchdogError(error)
+
+    def current_url(self,context:'Context')->str|None:
+        if context.session is None or context.session.current_page is None:
+            return None
+        url=context.session.current_page.url
+        return url if url and url!='about:blank' else None
+
+    def is_browser_lost(self,context:'Context')->bool:
+        playwright_browser=context.browser.playwright_browser
+        if playwright_browser is not None and not playwright_browser.is_connected():
+            return True
+        # Also covers persistent contexts, which have no browser object to ask
+        return context.session is not None and not context.is_session_alive()
+
+    async def recover(self,context:'Context'):
+        '''Replace the crashed or hung page, or the whole browser, and reopen the last healthy URL.'''
+        state=self.get_state(context)
+        state.recoveries+=1
+        reason=state.failure or 'Page stopped responding'
+        if state.recoveries>self.max_recoveries:
+            raise WatchdogError(f'Gave up after {self.max_recoveries} recoveries: {reason}')
+        with context.tracer.span('recover',reason=reason,attempt=state.recoveries) as span:
+            print(f'Recovering browser ({state.recoveries}/{self.max_recoveries}): {reason}')
+            if self.is_browser_lost(context):
+                span.attributes['target']='browser'
+                await context.reset_session()
+                await context.browser.relaunch()
+                await context.get_session()
+                reopen=True
+            else:
+                current_page=context.session.current_page
+                for page in state.crashed_pages-{current_page}:
+                    await context.discard_page(page)
+                reopen=current_page in state.crashed_pages or not await self.is_responsive(current_page)
+                if reopen:
+                    span.attributes['target']='page'
+                    await context.replace_page()
+            state.crashed_pages.clear()
+            state.failure=None
+            state.failed.clear()
+            self.watch(context)
+            if reopen and state.last_url is not None:
+                page=await context.get_current_page()
+                try:
+                    await page.goto(state.last_url,wait_until='domcontentloaded',timeout=self.playwright_timeout*1000)
+                except Exception as e:
+                    print(f'Failed to reopen {state.last_url}: {e}')
+                span.attributes['url']=state.last_url
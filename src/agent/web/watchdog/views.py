@@ -0,0 +1,21 @@
+from playwright.async_api import Page,BrowserContext as PlaywrightContext
+from dataclasses import dataclass,field
+import asyncio
+
+@dataclass
+class WatchState:
+    '''Failure and recovery state of the session of one Context, agents sharing a watchdog never see each other's.'''
+    failed:asyncio.Event=field(default_factory=asyncio.Event)
+    failure:str|None=None
+    crashed_pages:set[Page]=field(default_factory=set)
+    watched:set[PlaywrightContext]=field(default_factory=set)
+    last_url:str|None=None
+    recoveries:int=0
+
+    def fail(self,reason:str):
+        self.failure=self.failure or reason
+        self.failed.set()
+
+    def on_crash(self,page:Page):
+        self.crashed_pages.add(page)
+        self.fail(f'Page crashed: {page.url}')
@@ -4,12 +4,30 @@ from inspect import getdoc
 from json import dumps
 
 class Tool:
-    def __init__(self, name: str='',description: Optional[str]=None, params: Optional[BaseModel]=None,schema:Optional[dict]=None,func:Optional[Callable]=None):
+    def __init__(self, name: str='',description: Optional[str]=None, params: Optional[BaseModel]=None,schema:Optional[dict]=None,func:Optional[Callable]=None,
+    mutates_page:bool=True,parallel_safe:bool=False,max_concurrency:Optional[int]=None,cache_ttl:Optional[float]=None,cache_context:Optional[Callable]=None,cache_persist:bool=True,
+    timeout:Optional[float]=None,on_timeout:Optional[Callable]=None):
         self.name = name
         self.params = params
         self.func = func
         self.description = description
         self.schema = schema
+        # Whether the tool changes the current page (navigation, input, scrolling) or only reads it or works off-page
+        self.mutates_page = mutates_page
+        # Whether calls may run concurrently with other parallel safe calls of a batch, capped at max_concurrency per tool
+        self.parallel_safe = parallel_safe and not mutates_page
+        self.max_concurrency = max_concurrency
+        # Seconds a result stays reusable, None for tools that are not cacheable. A tool that changes the page never is
+        self.cache_ttl = cache_ttl if not mutates_page else None
+        # Coroutine taking the call's params and returning the state the result depends on (e.g. URL and DOM hash)
+        self.cache_context = cache_context
+        # Whether results may reach the on-disk store, off for content that can be private to a session
+        self.cache_persist = cache_persist
+        # Seconds a call may run before it is cancelled, None to fall back to the deadline of the registry
+        self.timeout = timeout
+        # Coroutine taking the call's params, run after a cancellation to undo what the task left behind
+        self.on_timeout = on_timeout
+        self.prompt = None
 
     def __call__(self, func):
         if self.params:
@@ -47,10 +65,15 @@ class Tool:
         
     def __repr__(self):
         if self.params is not None:
-            params=list(self.params.model_json_schema().get('properties').keys())
+            params=list(self.params.model_fields.keys())
         elif self.schema is not None:
             params=list(self.schema.get('properties').keys())
+        else:
+            params=[]
         return f"Tool(name={self.name}, description={self.description}, params={params})"
-    
+
     def get_prompt(self):
-        return f'''Tool Name: {self.name}\nTool Description: {self.description}\nTool Input: {dumps(self.schema,indent=2)}'''
\ No newline at end of file
+        # The schema is fixed once the tool is decorated, so the prompt is rendered only once
+        if self.prompt is None:
+            self.prompt=f'''Tool Name: {self.name}\nTool Description: {self.description}\nTool Input: {dumps(self.schema,indent=2)}'''
+        return self.prompt
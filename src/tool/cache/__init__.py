@@ -0,0 +1,75 @@
+from src.tool.cache.views import CacheEntry,CacheStats
+from collections import OrderedDict
+from dataclasses import asdict
+from hashlib import sha256
+from pathlib import Path
+from time import time
+import json
+
+class ResultCache:
+    '''
+    Results of cacheable tools keyed by the tool name, the validated params and the context the tool declares.
+
+    An in-memory LRU sits in front of a directory holding one JSON file per entry, so results outlive the
+    process and repeated tasks skip the work entirely. Tools whose results can be private to a session keep
+    them in memory only. Every entry expires after the TTL of its tool.
+    '''
+    def __init__(self,path:str='./cache_data/tool_results',max_entries:int=256):
+        self.path=Path(path)
+        self.max_entries=max_entries
+        self.entries:OrderedDict[str,CacheEntry]=OrderedDict()
+        self.stats=CacheStats()
+
+    def key(self,name:str,params:dict,fingerprint:str='')->str:
+        payload=json.dumps([name,params,fingerprint],sort_keys=True,default=str,ensure_ascii=False)
+        return sha256(payload.encode('utf-8')).hexdigest()
+
+    def file_path(self,key:str)->Path:
+        return self.path/key[:2]/f'{key}.json'
+
+    def remember(self,key:str,entry:CacheEntry):
+        self.entries[key]=entry
+        self.entries.move_to_end(key)
+        if len(self.entries)>self.max_entries:
+            self.entries.popitem(last=False)
+
+    def load(self,key:str)->CacheEntry|None:
+        try:
+            with open(self.file_path(key),'r',encoding='utf-8') as f:
+                return CacheEntry(**json.load(f))
+        except (OSError,ValueError,TypeError):
+            return None
+
+    def get(self,name:str,key:str)->str|None:
+        entry,disk=self.entries.get(key),False
+        if entry is None:
+            entry,disk=self.load(key),True
+        if entry is None or entry.expires<=time():
+            if entry is not None:
+                self.discard(key)
+            self.stats.record_miss(name)
+            return None
+        self.remember(key,entry)
+        self.stats.record_hit(name,disk=disk)
+        return entry.content
+
+    def set(self,name:str,key:str,content:str,ttl:float,persist:bool=True):
+        entry=CacheEntry(name=name,content=content,expires=time()+ttl)
+        self.remember(key,entry)
+        if not persist:
+            return None
+        file_path=self.file_path(key)
+        file_path.parent.mkdir(parents=True,exist_ok=True)
+        temp_path=file_path.with_suffix('.tmp')
+        with open(temp_path,'w',encoding='utf-8') as f:
+            json.dump(asdict(entry),f,ensure_ascii=False)
+        temp_path.replace(file_path)
+
+    def discard(self,key:str):
+        self.entries.pop(key,None)
+        self.file_path(key).unlink(missing_ok=True)
+
+    def clear(self):
+        self.entries.clear()
+        for file_path in self.path.glob('*/*.json'):
+            file_path.unlink(missing_ok=True)
@@ -0,0 +1,29 @@
+from dataclasses import dataclass,field
+
+@dataclass
+class CacheEntry:
+    name:str
+    content:str
+    expires:float
+
+@dataclass
+class CacheStats:
+    hits:dict[str,int]=field(default_factory=dict)
+    misses:dict[str,int]=field(default_factory=dict)
+    disk_hits:int=0
+
+    def record_hit(self,name:str,disk:bool=False):
+        self.hits[name]=self.hits.get(name,0)+1
+        self.disk_hits+=int(disk)
+
+    def record_miss(self,name:str):
+        self.misses[name]=self.misses.get(name,0)+1
+
+    def hit_rate(self)->float:
+        hits,misses=sum(self.hits.values()),sum(self.misses.values())
+        return hits/(hits+misses) if hits+misses else 0.0
+
+    def to_string(self)->str:
+        names=sorted(set(self.hits)|set(self.misses))
+        by_tool=', '.join(f'{name}: {self.hits.get(name,0)}/{self.hits.get(name,0)+self.misses.get(name,0)}' for name in names)
+        return f'{sum(self.hits.values())} hits ({self.disk_hits} from disk), {sum(self.misses.values())} misses, {self.hit_rate():.0%} hit rate ({by_tool})'
@@ -0,0 +1,104 @@
+from src.tool.metrics.views import ToolStats
+from abc import ABC,abstractmethod
+from pathlib import Path
+from time import time
+import json
+
+class BaseExporter(ABC):
+    @abstractmethod
+    def export(self,metrics:'ToolMetrics')->None:
+        pass
+
+    def close(self)->None:
+        pass
+
+def escape_label(value:str)->str:
+    return value.replace('\\','\\\\').replace('"','\\"').replace('\n','\\n')
+
+class PrometheusExporter(BaseExporter):
+    '''
+    Writes the metrics in the Prometheus text exposition format, for the node exporter textfile collector.
+
+    `render` returns the same text for serving it from an HTTP endpoint instead.
+    '''
+    def __init__(self,path:str='./metrics/tools.prom'):
+        self.path=Path(path)
+
+    def render(self,metrics:'ToolMetrics')->str:
+        lines=[
+            '# HELP tool_calls_total Tool calls executed.',
+            '# TYPE tool_calls_total counter'
+        ]
+        tools=sorted(metrics.tools.items())
+        for name,stats in tools:
+            lines.append(f'tool_calls_total{{tool="{escape_label(name)}"}} {stats.calls}')
+        lines+=['# HELP tool_errors_total Failed tool calls by exception type.','# TYPE tool_errors_total counter']
+        for name,stats in tools:
+            for error,count in sorted(stats.errors.items()):
+                lines.append(f'tool_errors_total{{tool="{escape_label(name)}",type="{escape_label(error)}"}} {count}')
+        for metric,help,quantiles,total,count in (
+            ('tool_duration_seconds','Tool call duration.',lambda stats:stats.duration_quantiles(),lambda stats:stats.duration_sum,lambda stats:stats.duration_count),
+            ('tool_result_bytes','Size of the tool results.',lambda stats:stats.size_quantiles(),lambda stats:stats.bytes_sum,lambda stats:stats.calls)):
+            lines+=[f'# HELP {metric} {help}',f'# TYPE {metric} summary']
+            for name,stats in tools:
+                label=escape_label(name)
+                for q,value in quantiles(stats).items():
+                    lines.append(f'{metric}{{tool="{label}",quantile="{q}"}} {value}')
+                lines.append(f'{metric}_sum{{tool="{label}"}} {total(stats)}')
+                lines.append(f'{metric}_count{{tool="{label}"}} {count(stats)}')
+        return '\n'.join(lines)+'\n'
+
+    def export(self,metrics:'ToolMetrics'):
+        self.path.parent.mkdir(parents=True,exist_ok=True)
+        # The collector may read at any time, never let it see a half written file
+        temp_path=self.path.with_suffix('.tmp')
+        temp_path.write_text(self.render(metrics),encoding='utf-8')
+        temp_path.replace(self.path)
+
+class JSONLExporter(BaseExporter):
+    '''Appends one JSON object per export holding the metrics of every tool, the file is opened again after a close.'''
+    def __init__(self,path:str='./metrics/tools.jsonl'):
+        self.path=Path(path)
+        self.path.parent.mkdir(parents=True,exist_ok=True)
+        self.file=None
+
+    def export(self,metrics:'ToolMetrics'):
+        if self.file is None:
+            self.file=open(self.path,'a',encoding='utf-8')
+        self.file.write(json.dumps({'timestamp':time(),'tools':metrics.to_dict()})+'\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file=None
+
+class ToolMetrics:
+    '''
+    Counts calls, errors by exception type, durations and result sizes per tool, in process.
+
+    The exporters are only invoked by `export`, so recording a call costs a few appends.
+    '''
+    def __init__(self,exporters:list[BaseExporter]=[]):
+        self.exporters=exporters
+        self.tools:dict[str,ToolStats]={}
+
+    def record(self,name:str,duration:float|None,content:str,error:str=None):
+        stats=self.tools.setdefault(name,ToolStats())
+        stats.record(duration,len(content.encode('utf-8',errors='ignore')),error)
+
+    def to_dict(self)->dict[str,dict]:
+        return {name:stats.to_dict() for name,stats in self.tools.items()}
+
+    def to_string(self)->str:
+        # The tools that took the most time first
+        tools=sorted(self.tools.items(),key=lambda item:item[1].duration_sum,reverse=True)
+        return '\n'.join(f'{name}: {stats.to_string()}' for name,stats in tools)
+
+    def export(self):
+        for exporter in self.exporters:
+            exporter.export(self)
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
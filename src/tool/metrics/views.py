@@ -0,0 +1,60 @@
+from dataclasses import dataclass,field
+from collections import deque
+from typing import Any
+import math
+
+# Most recent calls per tool the percentiles are computed over
+WINDOW_SIZE=1024
+
+QUANTILES=(0.5,0.95,0.99)
+
+def percentile(samples:list[float],q:float)->float:
+    '''Nearest-rank percentile, 0 without samples.'''
+    if not samples:
+        return 0.0
+    ordered=sorted(samples)
+    return ordered[max(math.ceil(q*len(ordered))-1,0)]
+
+@dataclass
+class ToolStats:
+    calls:int=0
+    errors:dict[str,int]=field(default_factory=dict)
+    duration_count:int=0
+    duration_sum:float=0.0
+    bytes_sum:int=0
+    durations:deque[float]=field(default_factory=lambda:deque(maxlen=WINDOW_SIZE))
+    sizes:deque[int]=field(default_factory=lambda:deque(maxlen=WINDOW_SIZE))
+
+    def record(self,duration:float|None,size:int,error:str|None):
+        self.calls+=1
+        if error is not None:
+            self.errors[error]=self.errors.get(error,0)+1
+        # A call rejected before it ran has no duration worth counting
+        if duration is not None:
+            self.duration_count+=1
+            self.duration_sum+=duration
+            self.durations.append(duration)
+        self.bytes_sum+=size
+        self.sizes.append(size)
+
+    def duration_quantiles(self)->dict[float,float]:
+        durations=list(self.durations)
+        return {q:percentile(durations,q) for q in QUANTILES}
+
+    def size_quantiles(self)->dict[float,int]:
+        sizes=list(self.sizes)
+        return {q:percentile(sizes,q) for q in QUANTILES}
+
+    def to_dict(self)->dict[str,Any]:
+        return {
+            'calls':self.calls,
+            'errors':dict(self.errors),
+            'duration_sum_seconds':self.duration_sum,
+            'duration_seconds':{f'p{round(q*100)}':value for q,value in self.duration_quantiles().items()},
+            'bytes_sum':self.bytes_sum,
+            'bytes':{f'p{round(q*100)}':value for q,value in self.size_quantiles().items()}
+        }
+
+    def to_string(self)->str:
+        quantiles=self.duration_quantiles()
+        return f'{self.calls} calls, {sum(self.errors.values())} errors, p50 {quantiles[0.5]:.2f}s, p95 {quantiles[0.95]:.2f}s, {self.duration_sum:.2f}s total, {self.bytes_sum/1024:.1f} KB returned'
@@ -1,78 +1,208 @@
 # src/tool/registry/__init__.py
 from src.tool.registry.views import Function,ToolResult
+from src.tool.cache import ResultCache
+from src.tool.metrics import ToolMetrics
 from src.tool import Tool
+from pydantic import BaseModel,TypeAdapter
+from typing import Callable,Type
+from time import perf_counter
+import asyncio
+
+DEFAULT_MAX_CONCURRENCY=4
+# Seconds a cancelled tool and its cleanup hook get to wind down before they are abandoned
+CLEANUP_TIMEOUT=5
+
+def compile_validator(params:Type[BaseModel]|None)->Callable[[dict],dict]:
+    '''
+    Build the function turning an action input into the params of its tool, once per tool.
+
+    It gives the same params as `params.model_validate(input).model_dump()` while skipping the work that
+    does not change them: a tool without fields is not validated at all, and a flat model is read back
+    from its fields instead of being serialized again.
+    '''
+    if params is None:
+        return dict
+    allow_extra=params.model_config.get('extra')=='allow'
+    if not params.model_fields:
+        return dict if allow_extra else (lambda input:{})
+    adapter=TypeAdapter(params)
+    if '$defs' in params.model_json_schema():
+        # Nested models and enums have to be dumped into plain values
+        return lambda input:adapter.validate_python(input).model_dump()
+    def validate(input:dict)->dict:
+        model=adapter.validate_python(input)
+        return model.__dict__|(model.__pydantic_extra__ or {})
+    return validate
 
 class Registry:
-    def __init__(self,tools:list[Tool]):
+    def __init__(self,tools:list[Tool],cache:ResultCache=None,default_timeout:float=None,metrics:ToolMetrics=None):
         self.tools=tools
+        self.cache=cache
+        self.metrics=metrics
+        # Deadline of the tools that do not declare their own, None for no deadline
+        self.default_timeout=default_timeout
         self.tools_registry=self.registry()
+        self.prompts:dict[frozenset[str],str]={}
 
     def tools_prompt(self,excluded_tools:list[str]=[])->str:
-        prompts=[]
-        for tool in self.tools:
-            if tool.name in excluded_tools:
-                continue
-            prompts.append(tool.get_prompt())
-        return '\n\n'.join(prompts)
+        key=frozenset(excluded_tools)
+        if key not in self.prompts:
+            self.prompts[key]='\n\n'.join(tool.get_prompt() for tool in self.tools if tool.name not in key)
+        return self.prompts[key]
 
     def registry(self)->dict[str,Function]:
         tools_registry={}
         for tool in self.tools:
-            tools_registry.update({tool.name : Function(name=tool.name,description=tool.description,params=tool.params,function=tool.func)})
+            tools_registry.update({tool.name : Function(name=tool.name,description=tool.description,params=tool.params,function=tool.func,
+            mutates_page=tool.mutates_page,parallel_safe=tool.parallel_safe,max_concurrency=tool.max_concurrency,
+            cache_ttl=tool.cache_ttl,cache_context=tool.cache_context,cache_persist=tool.cache_persist,validator=compile_validator(tool.params),
+            timeout=tool.timeout,on_timeout=tool.on_timeout)})
         return tools_registry
 
-    async def async_execute(self,name:str,input:dict,**kwargs)->ToolResult:
+    def validate(self,name:str,input:dict,**kwargs)->tuple[Function,dict]:
+        '''Resolve the tool and validate its input, raising on an unknown tool or invalid input.'''
         tool=self.tools_registry.get(name)
+        # Check if name is None or empty, which indicates an LLM failure
+        if not name:
+            raise ValueError('Action Name was None or empty. The LLM failed to choose a valid action.')
+
+        if tool is None:
+            raise ValueError(f'Tool "{name}" not found. Please choose from the available tools.')
+
+        if tool.params:
+            # Ensure input is a dictionary before validation
+            if not isinstance(input, dict):
+                raise TypeError(f"Action Input for tool '{name}' must be a dictionary, but got {type(input)}: {input}")
+        return tool,tool.validator(input)|kwargs
+
+    def error_result(self,name:str,input:dict,error:Exception)->ToolResult:
+        # If 'name' was the issue, use a placeholder 'Invalid Action'
+        # Otherwise, use the provided 'name'.
+        error_name = name if name else "Invalid Action"
+        error_content = f"Error executing tool '{error_name}': {str(error)}"
+        print(f"DEBUG: Tool execution failed. Name: {name}, Input: {input}, Error: {error}")
+        return ToolResult(name=error_name, content=error_content, status='error')
+
+    def deadline(self,tool:Function,timeout:float=None)->float|None:
+        '''The tighter of the deadline of the call and the deadline of the tool, or of the registry when the tool has none.'''
+        limit=tool.timeout if tool.timeout is not None else self.default_timeout
+        if timeout is None or limit is None:
+            return limit if timeout is None else timeout
+        return min(timeout,limit)
+
+    async def cancel(self,tool:Function,task:asyncio.Task,params:dict):
+        '''Cancel a tool past its deadline and run its cleanup hook, both bounded so neither can hang the caller.'''
+        task.cancel()
+        await asyncio.wait({task},timeout=CLEANUP_TIMEOUT)
+        if not task.done():
+            # The tool swallowed the cancellation, leave it behind but never log its outcome as unretrieved
+            task.add_done_callback(lambda task:task.cancelled() or task.exception())
+        if tool.on_timeout is None:
+            return None
         try:
-            # Check if name is None or empty, which indicates an LLM failure
-            if not name:
-                raise ValueError('Action Name was None or empty. The LLM failed to choose a valid action.')
-
-            if tool is None:
-                raise ValueError(f'Tool "{name}" not found. Please choose from the available tools.')
-
-            if tool.params:
-                # Ensure input is a dictionary before validation
-                if not isinstance(input, dict):
-                     raise TypeError(f"Action Input for tool '{name}' must be a dictionary, but got {type(input)}: {input}")
-                tool_params=tool.params.model_validate(input)
-                params=tool_params.model_dump()|kwargs
-            else:
-                params=input|kwargs
-
-            content=await tool.function(**params)
-            return ToolResult(name=name,content=content)
+            await asyncio.wait_for(tool.on_timeout(**params),timeout=CLEANUP_TIMEOUT)
         except Exception as e:
-            # If 'name' was the issue, use a placeholder 'Invalid Action'
-            # Otherwise, use the provided 'name'.
-            error_name = name if name else "Invalid Action"
-            error_content = f"Error executing tool '{error_name}': {str(e)}"
-            print(f"DEBUG: Tool execution failed. Name: {name}, Input: {input}, Error: {e}")
-            return ToolResult(name=error_name, content=error_content)
+            print(f"DEBUG: Cleanup of tool '{tool.name}' failed: {e}")
 
-    def execute(self,name:str,input:dict,**kwargs)->ToolResult:
-        tool=self.tools_registry.get(name)
+    async def run_with_deadline(self,tool:Function,params:dict,kwargs:dict,timeout:float=None)->ToolResult:
+        timeout=self.deadline(tool,timeout)
+        if timeout is None:
+            return ToolResult(name=tool.name,content=await self.call(tool,params,kwargs))
+        task=asyncio.ensure_future(self.call(tool,params,kwargs))
+        try:
+            done,_=await asyncio.wait({task},timeout=timeout)
+        except asyncio.CancelledError:
+            # The caller gave up on the call (e.g. a watchdog deadline), the tool must not outlive it
+            task.cancel()
+            raise
+        if task in done:
+            return ToolResult(name=tool.name,content=task.result())
+        await self.cancel(tool,task,params)
+        content=f"Tool '{tool.name}' timed out after {timeout}s and was cancelled. Retry with a smaller task or choose another action."
+        return ToolResult(name=tool.name,content=content,status='timeout')
+
+    async def run(self,tool:Function,params:dict,input:dict,kwargs:dict,timeout:float=None)->ToolResult:
+        start=perf_counter()
+        try:
+            result=await self.run_with_deadline(tool,params,kwargs,timeout)
+            error='TimeoutError' if result.status=='timeout' else None
+        except Exception as e:
+            result=self.error_result(tool.name,input,e)
+            error=type(e).__name__
+        if self.metrics is not None:
+            self.metrics.record(tool.name,perf_counter()-start,result.content,error)
+        return result
+
+    def rejected(self,name:str,input:dict,error:Exception)->ToolResult:
+        '''Error result of a call that failed validation, counted as a failed call of its tool.'''
+        result=self.error_result(name,input,error)
+        if self.metrics is not None:
+            # Names the LLM made up share one series, so they cannot blow up the label set
+            self.metrics.record(name if name in self.tools_registry else 'Invalid Action',None,result.content,type(error).__name__)
+        return result
+
+    async def cache_key(self,tool:Function,params:dict,kwargs:dict)->str:
+        fingerprint=await tool.cache_context(**params) if tool.cache_context else ''
+        # The injected kwargs (e.g. the browser context) are not part of the call itself
+        return self.cache.key(tool.name,{key:value for key,value in params.items() if key not in kwargs},fingerprint)
+
+    async def call(self,tool:Function,params:dict,kwargs:dict)->str:
+        '''Run the tool, answering from the result cache when the tool is cacheable and the cache holds the call.'''
+        if self.cache is None or tool.cache_ttl is None:
+            return await tool.function(**params)
+        content=self.cache.get(tool.name,await self.cache_key(tool,params,kwargs))
+        if content is not None:
+            return content
+        content=await tool.function(**params)
+        # Keyed by the state after the call, which is what the next identical call finds (e.g. the downloaded file)
+        self.cache.set(tool.name,await self.cache_key(tool,params,kwargs),content,tool.cache_ttl,persist=tool.cache_persist)
+        return content
+
+    async def async_execute(self,name:str,input:dict,timeout:float=None,**kwargs)->ToolResult:
+        '''Execute a tool call, `timeout` bounds this call on top of the deadline of the tool.'''
         try:
-            # Check if name is None or empty
-            if not name:
-                raise ValueError('Action Name was None or empty. The LLM failed to choose a valid action.')
-
-            if tool is None:
-                raise ValueError(f'Tool "{name}" not found. Please choose from the available tools.')
-
-            if tool.params:
-                # Ensure input is a dictionary before validation
-                if not isinstance(input, dict):
-                    raise TypeError(f"Action Input for tool '{name}' must be a dictionary, but got {type(input)}: {input}")
-                tool_params=tool.params.model_validate(input)
-                params=tool_params.model_dump()|kwargs
-            else:
-                params=input|kwargs
+            tool,params=self.validate(name,input,**kwargs)
+        except Exception as e:
+            return self.rejected(name,input,e)
+        return await self.run(tool,params,input,kwargs,timeout)
+
+    async def async_execute_many(self,calls:list[tuple[str,dict]],timeout:float=None,**kwargs)->list[ToolResult]:
+        '''
+        Execute a batch of tool calls and return their results in the order of the calls.
 
+        Every call is validated before any runs, an invalid call only fails itself. Consecutive parallel safe calls
+        run concurrently, at most `max_concurrency` at a time per tool, any other call waits for the calls before
+        it and runs alone, so page changing calls keep their order. `timeout` bounds every call on its own.
+        '''
+        results:list[ToolResult|None]=[None]*len(calls)
+        validated:list[tuple[int,Function,dict]]=[]
+        for position,(name,input) in enumerate(calls):
+            try:
+                tool,params=self.validate(name,input,**kwargs)
+            except Exception as e:
+                results[position]=self.rejected(name,input,e)
+                continue
+            validated.append((position,tool,params))
+        semaphores:dict[str,asyncio.Semaphore]={}
+        async def run(position:int,tool:Function,params:dict):
+            semaphore=semaphores.setdefault(tool.name,asyncio.Semaphore(tool.max_concurrency or DEFAULT_MAX_CONCURRENCY))
+            async with semaphore:
+                results[position]=await self.run(tool,params,calls[position][1],kwargs,timeout)
+        group:list[tuple[int,Function,dict]]=[]
+        for position,tool,params in validated:
+            if tool.parallel_safe:
+                group.append((position,tool,params))
+                continue
+            await asyncio.gather(*[run(*call) for call in group])
+            group=[]
+            await run(position,tool,params)
+        await asyncio.gather(*[run(*call) for call in group])
+        return results
+
+    def execute(self,name:str,input:dict,**kwargs)->ToolResult:
+        try:
+            tool,params=self.validate(name,input,**kwargs)
             content=tool.function(**params)
             return ToolResult(name=name,content=content)
         except Exception as e:
-            error_name = name if name else "Invalid Action"
-            error_content = f"Error executing tool '{error_name}': {str(e)}"
-            print(f"DEBUG: Tool execution failed. Name: {name}, Input: {input}, Error: {e}")
-            return ToolResult(name=error_name,content=error_content)
\ No newline at end of file
+            return self.error_result(name,input,e)
@@ -1,13 +1,23 @@
 from pydantic import BaseModel,Field,ConfigDict
-from typing import Callable,Type
+from typing import Callable,Literal,Type
 
 class Function(BaseModel):
     name:str=Field(...,description="the name of the action")
     description:str=Field(...,description="the description of the action")
     params:Type[BaseModel]|None
     function:Callable|None
+    mutates_page:bool=Field(default=True,description="whether the action changes the current page")
+    parallel_safe:bool=Field(default=False,description="whether the action may run concurrently with other parallel safe actions")
+    max_concurrency:int|None=Field(default=None,description="the most concurrent runs of the action within a batch")
+    cache_ttl:float|None=Field(default=None,description="the seconds a result of the action stays reusable, None when it is not cacheable")
+    cache_context:Callable|None=Field(default=None,description="returns the state a result of the action depends on")
+    cache_persist:bool=Field(default=True,description="whether results of the action may be stored on disk")
+    timeout:float|None=Field(default=None,description="the seconds the action may run before it is cancelled")
+    on_timeout:Callable|None=Field(default=None,description="cleans up after the action was cancelled past its deadline")
+    validator:Callable[[dict],dict]=Field(default=dict,description="validates the input of the action into its params")
     model_config=ConfigDict(arbitrary_types_allowed=True)
 
 class ToolResult(BaseModel):
     name: str = Field(...,description="the action taken")
-    content: str = Field(...,description="the output of the action")
\ No newline at end of file
+    content: str = Field(...,description="the output of the action")
+    status: Literal['success','error','timeout'] = Field(default='success',description="whether the action succeeded, failed or ran past its deadline")
\ No newline at end of file
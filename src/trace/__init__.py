@@ -0,0 +1,83 @@
+from src.trace.views import Span
+from contextlib import contextmanager
+from contextvars import ContextVar
+from abc import ABC,abstractmethod
+from time import perf_counter_ns,time_ns
+from pathlib import Path
+from uuid import uuid4
+import json
+
+current_span:ContextVar[Span|None]=ContextVar('current_span',default=None)
+
+class BaseSink(ABC):
+    @abstractmethod
+    def export(self,span:Span)->None:
+        pass
+
+    def close(self)->None:
+        pass
+
+class JSONLSink(BaseSink):
+    '''
+    Appends one JSON object per finished span, the fields follow the OpenTelemetry span data model.
+
+    The file is opened on the first span after a close, so a tracer shared by several runs can be closed after each.
+    '''
+    def __init__(self,path:str='./traces/spans.jsonl'):
+        self.path=Path(path)
+        self.path.parent.mkdir(parents=True,exist_ok=True)
+        self.file=None
+
+    def export(self,span:Span):
+        if self.file is None:
+            self.file=open(self.path,'a',encoding='utf-8')
+        self.file.write(json.dumps(span.to_dict(),default=str)+'\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file=None
+
+class Tracer:
+    '''
+    Times nested phases with a monotonic clock and exports them as spans.
+
+    Without a sink the tracer is disabled and `span` only hands back a throwaway span,
+    so instrumented code pays next to nothing.
+    '''
+    def __init__(self,sink:BaseSink=None):
+        self.sink=sink
+
+    @property
+    def enabled(self)->bool:
+        return self.sink is not None
+
+    @contextmanager
+    def span(self,name:str,**attributes):
+        if not self.enabled:
+            yield Span(name=name,attributes=attributes)
+            return
+        parent=current_span.get()
+        span=Span(name=name,attributes=attributes)
+        span.trace_id=parent.trace_id if parent else uuid4().hex
+        span.span_id=uuid4().hex[:16]
+        span.parent_span_id=parent.span_id if parent else None
+        span.start_time_unix_nano=time_ns()
+        token=current_span.set(span)
+        start=perf_counter_ns()
+        try:
+            yield span
+        except BaseException as e:
+            span.status='error'
+            span.attributes['exception']=type(e).__name__
+            raise
+        finally:
+            span.duration_ns=perf_counter_ns()-start
+            span.end_time_unix_nano=span.start_time_unix_nano+span.duration_ns
+            current_span.reset(token)
+            self.sink.export(span)
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
@@ -0,0 +1,27 @@
+from dataclasses import dataclass,field
+from typing import Any
+
+@dataclass
+class Span:
+    name:str
+    trace_id:str=''
+    span_id:str=''
+    parent_span_id:str|None=None
+    start_time_unix_nano:int=0
+    end_time_unix_nano:int=0
+    duration_ns:int=0
+    status:str='ok'
+    attributes:dict[str,Any]=field(default_factory=dict)
+
+    def to_dict(self)->dict[str,Any]:
+        return {
+            'name':self.name,
+            'trace_id':self.trace_id,
+            'span_id':self.span_id,
+            'parent_span_id':self.parent_span_id,
+            'start_time_unix_nano':self.start_time_unix_nano,
+            'end_time_unix_nano':self.end_time_unix_nano,
+            'duration_ms':self.duration_ns/1e6,
+            'status':self.status,
+            'attributes':self.attributes
+        }
@@ -0,0 +1,36 @@
+from src.message import HumanMessage,AIMessage,SystemMessage,ImageMessage,ToolMessage
+from src.agent.web.checkpoint import AgentStateSerializer
+from src.agent.web.context.views import BrowserState,Tab
+from src.agent.web.dom.views import DOMState
+
+def round_trip(obj):
+    serializer=AgentStateSerializer()
+    return serializer.loads_typed(serializer.dumps_typed(obj))
+
+def test_messages_survive_a_round_trip():
+    messages=[
+        SystemMessage('You are a web agent.'),
+        HumanMessage('Find the cheapest lamp.'),
+        AIMessage('<thought>Search first</thought>'),
+        ToolMessage(id='call-1',name='GoTo Tool',args={'url':'https://example.com'}),
+        ImageMessage(text='Current page',image_obj=b'\x89PNG'),
+    ]
+    restored=round_trip({'messages':messages})['messages']
+    assert [type(message) for message in restored]==[type(message) for message in messages]
+    assert [message.__dict__ for message in restored]==[message.__dict__ for message in messages]
+    assert isinstance(restored[-1].content,tuple)
+
+def test_browser_state_keeps_only_the_tabs():
+    tabs=[Tab(id=0,url='https://example.com',title='Example',page=object()),Tab(id=1,url='https://example.org',title='Other',page=object())]
+    state=BrowserState(current_tab=tabs[1],tabs=tabs,screenshot='base64...',dom_state=DOMState())
+    restored=round_trip({'browser_state':state,'step':3})
+    assert restored['step']==3
+    browser_state=restored['browser_state']
+    assert [(tab.id,tab.url,tab.title,tab.page) for tab in browser_state.tabs]==[(0,'https://example.com','Example',None),(1,'https://example.org','Other',None)]
+    assert (browser_state.current_tab.id,browser_state.current_tab.page)==(1,None)
+    assert browser_state.screenshot is None
+    assert browser_state.dom_state==DOMState()
+
+def test_browser_state_without_a_current_tab():
+    restored=round_trip(BrowserState(current_tab=None,tabs=[],dom_state=DOMState()))
+    assert restored.current_tab is None and restored.tabs==[]
@@ -0,0 +1,102 @@
+from src.agent.web.download import Downloader,DownloadError,parse_content_range
+import src.agent.web.download as download_module
+import asyncio
+import httpx
+import pytest
+import json
+import re
+
+BODY=bytes(range(256))*20
+
+def make_server(body:bytes=BODY,ranges:bool=True,known_size:bool=True,fail_after:int=None):
+    '''A MockTransport serving `body` as a PDF, optionally honouring Range requests.'''
+    requests=[]
+    def handler(request:httpx.Request)->httpx.Response:
+        requests.append(request.headers.get('range'))
+        headers={'content-type':'application/pdf'}
+        match=re.match(r'bytes=(\d+)-(\d+)',request.headers.get('range') or '')
+        if not (ranges and match):
+            return httpx.Response(200,headers=headers,content=body)
+        start,end=int(match.group(1)),int(match.group(2))
+        if fail_after is not None and start>=fail_after:
+            return httpx.Response(503,headers=headers)
+        size=len(body) if known_size else '*'
+        return httpx.Response(206,headers=headers|{'content-range':f'bytes {start}-{end}/{size}'},content=body[start:end+1])
+    return httpx.MockTransport(handler),requests
+
+def use_server(monkeypatch,transport:httpx.MockTransport):
+    client=httpx.AsyncClient(transport=transport)
+    monkeypatch.setattr(download_module,'get_client',lambda:client)
+
+@pytest.mark.parametrize('header,total',[
+    ('bytes 0-0/5004',5004),
+    ('bytes 100-199/1000',1000),
+    ('bytes 0-0/*',None),
+    ('bytes */1000',None),
+    ('',None),
+    (None,None),
+])
+def test_parse_content_range(header,total):
+    assert parse_content_range(header)==total
+
+def test_ranged_download_reassembles_the_chunks(tmp_path,monkeypatch):
+    transport,requests=make_server()
+    use_server(monkeypatch,transport)
+    path=tmp_path/'report.pdf'
+    progress=asyncio.run(Downloader('https://example.com/report.pdf',path,chunk_size=1000,parallel_threshold=0).download())
+    assert path.read_bytes()==BODY
+    assert progress.total==len(BODY)
+    assert progress.connections==4
+    assert requests.count('bytes=0-999')==1
+    assert not (tmp_path/'report.pdf.part').exists()
+    assert not (tmp_path/'report.pdf.part.json').exists()
+
+def test_server_without_ranges_gets_the_probe_body(tmp_path,monkeypatch):
+    transport,requests=make_server(ranges=False)
+    use_server(monkeypatch,transport)
+    path=tmp_path/'report.pdf'
+    asyncio.run(Downloader('https://example.com/report.pdf',path,chunk_size=1000).download())
+    assert path.read_bytes()==BODY
+    assert requests==['bytes=0-0']
+
+def test_unknown_size_is_downloaded_again_without_a_range(tmp_path,monkeypatch):
+    transport,requests=make_server(known_size=False)
+    use_server(monkeypatch,transport)
+    path=tmp_path/'report.pdf'
+    progress=asyncio.run(Downloader('https://example.com/report.pdf',path,chunk_size=1000).download())
+    assert path.read_bytes()==BODY
+    assert requests==['bytes=0-0',None]
+    assert progress.downloaded==len(BODY)
+
+def test_interrupted_download_resumes_from_the_finished_chunks(tmp_path,monkeypatch):
+    path=tmp_path/'report.pdf'
+    transport,_=make_server(fail_after=3000)
+    use_server(monkeypatch,transport)
+    with pytest.raises(DownloadError):
+        asyncio.run(Downloader('https://example.com/report.pdf',path,chunk_size=1000,connections=1).download())
+    state=json.loads((tmp_path/'report.pdf.part.json').read_text())
+    assert state['done']==[0,1,2]
+    transport,requests=make_server()
+    use_server(monkeypatch,transport)
+    progress=asyncio.run(Downloader('https://example.com/report.pdf',path,chunk_size=1000,connections=1).download())
+    assert path.read_bytes()==BODY
+    assert progress.resumed==3000
+    assert 'bytes=0-999' not in requests
+
+def test_a_changed_chunk_size_starts_over(tmp_path,monkeypatch):
+    path=tmp_path/'report.pdf'
+    transport,_=make_server(fail_after=3000)
+    use_server(monkeypatch,transport)
+    with pytest.raises(DownloadError):
+        asyncio.run(Downloader('https://example.com/report.pdf',path,chunk_size=1000,connections=1).download())
+    transport,_=make_server()
+    use_server(monkeypatch,transport)
+    progress=asyncio.run(Downloader('https://example.com/report.pdf',path,chunk_size=2000,connections=1).download())
+    assert path.read_bytes()==BODY
+    assert progress.resumed==0
+
+def test_html_responses_are_not_downloaded(tmp_path,monkeypatch):
+    client=httpx.AsyncClient(transport=httpx.MockTransport(lambda request:httpx.Response(200,headers={'content-type':'text/html'},content=b'<html></html>')))
+    monkeypatch.setattr(download_module,'get_client',lambda:client)
+    with pytest.raises(DownloadError,match='not a downloadable file'):
+        asyncio.run(Downloader('https://example.com/report.pdf',tmp_path/'report.pdf').download())
@@ -0,0 +1,52 @@
+from src.agent.web.extract import RecordWriter,infer_type,merge_types
+import src.agent.web.extract as extract_module
+import asyncio
+import json
+import csv
+
+def test_csv_writer_keeps_the_columns_and_ignores_extra_fields(tmp_path):
+    path=tmp_path/'out'/'records.csv'
+    writer=RecordWriter(path,['name','price'],'csv')
+    writer.write([{'name':'Lamp','price':'$20'},{'name':'Desk, oak','price':'$150','extra':'x'}])
+    writer.write([{'name':'Chair','price':''}])
+    writer.close()
+    with open(path,newline='',encoding='utf-8') as f:
+        rows=list(csv.DictReader(f))
+    assert rows==[{'name':'Lamp','price':'$20'},{'name':'Desk, oak','price':'$150'},{'name':'Chair','price':''}]
+
+def test_jsonl_writer_writes_one_record_per_line(tmp_path):
+    path=tmp_path/'records.jsonl'
+    writer=RecordWriter(path,['name'],'jsonl')
+    writer.write([{'name':'Café'},{'name':'Bar'}])
+    writer.close()
+    lines=path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines]==[{'name':'Café'},{'name':'Bar'}]
+
+def test_types_are_inferred_and_merged():
+    assert infer_type(['$1,200','15%','-3.5'])=='number'
+    assert infer_type(['https://a.com','http://b.com'])=='url'
+    assert infer_type(['','  '.strip()])=='empty'
+    assert infer_type(['12','twelve'])=='text'
+    assert merge_types('empty','number')=='number'
+    assert merge_types('number','empty')=='number'
+    assert merge_types('number','url')=='text'
+
+def test_later_pages_are_mapped_onto_the_first_page_columns(tmp_path,monkeypatch):
+    pages=[
+        {'kind':'table','selector':'table','columns':['name','price'],'rows':[['Lamp','']]},
+        {'kind':'table','selector':'table','columns':['price','name','stock'],'rows':[['$20','Desk','3']]},
+        {'kind':'table','selector':'table','columns':['price','name','stock'],'rows':[['$20','Desk','3']]},
+    ]
+    async def extract_page(context,selector=None):
+        return pages.pop(0)
+    async def go_to_next_page(context,next_selector):
+        return True
+    monkeypatch.setattr(extract_module,'extract_page',extract_page)
+    monkeypatch.setattr(extract_module,'go_to_next_page',go_to_next_page)
+    path=tmp_path/'records.jsonl'
+    extraction=asyncio.run(extract_module.extract_records(None,path,next_selector='.next',max_pages=5,format='jsonl'))
+    assert [json.loads(line) for line in path.read_text().splitlines()]==[{'name':'Lamp','price':''},{'name':'Desk','price':'$20'}]
+    # The third page repeated the second one, so the last page was reached
+    assert (extraction.rows,extraction.pages)==(2,2)
+    assert extraction.dropped_columns==['stock']
+    assert extraction.types=={'name':'text','price':'number'}
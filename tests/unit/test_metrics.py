@@ -0,0 +1,67 @@
+from src.tool.metrics import ToolMetrics,PrometheusExporter,JSONLExporter
+from src.tool.metrics.views import percentile
+import json
+
+def make_metrics()->ToolMetrics:
+    metrics=ToolMetrics()
+    for duration in (0.1,0.2,0.3,0.4):
+        metrics.record('Scrape Tool',duration,'x'*100)
+    metrics.record('Scrape Tool',None,'bad input','ValidationError')
+    metrics.record('Click "Tool"',2.0,'',  'TimeoutError')
+    return metrics
+
+def test_percentile_is_nearest_rank():
+    samples=[float(value) for value in range(1,101)]
+    assert percentile(samples,0.5)==50
+    assert percentile(samples,0.95)==95
+    assert percentile(samples,0.99)==99
+    assert percentile([],0.5)==0.0
+
+def test_stats_count_calls_errors_durations_and_bytes():
+    stats=make_metrics().tools['Scrape Tool']
+    assert stats.calls==5
+    assert stats.errors=={'ValidationError':1}
+    assert stats.duration_count==4
+    assert round(stats.duration_sum,6)==1.0
+    assert stats.bytes_sum==409
+    assert stats.duration_quantiles()[0.5]==0.2
+
+def test_prometheus_exporter_writes_the_text_format(tmp_path):
+    exporter=PrometheusExporter(tmp_path/'tools.prom')
+    metrics=ToolMetrics([exporter])
+    metrics.record('Click "Tool"',2.0,'','TimeoutError')
+    metrics.export()
+    text=(tmp_path/'tools.prom').read_text()
+    assert '# TYPE tool_calls_total counter' in text
+    assert 'tool_calls_total{tool="Click \\"Tool\\""} 1' in text
+    assert 'tool_errors_total{tool="Click \\"Tool\\"",type="TimeoutError"} 1' in text
+    assert 'tool_duration_seconds{tool="Click \\"Tool\\"",quantile="0.99"} 2.0' in text
+    assert 'tool_duration_seconds_count{tool="Click \\"Tool\\""} 1' in text
+    assert text.endswith('\n')
+
+def test_jsonl_exporter_appends_one_snapshot_per_export(tmp_path):
+    exporter=JSONLExporter(tmp_path/'tools.jsonl')
+    metrics=make_metrics()
+    metrics.exporters=[exporter]
+    metrics.export()
+    metrics.export()
+    metrics.close()
+    lines=(tmp_path/'tools.jsonl').read_text().splitlines()
+    assert len(lines)==2
+    snapshot=json.loads(lines[0])
+    assert snapshot['tools']['Scrape Tool']['calls']==5
+    assert snapshot['tools']['Click "Tool"']['errors']=={'TimeoutError':1}
+
+def test_jsonl_exporter_reopens_its_file_after_a_close(tmp_path):
+    exporter=JSONLExporter(tmp_path/'tools.jsonl')
+    metrics=ToolMetrics([exporter])
+    metrics.export()
+    metrics.close()
+    assert exporter.file is None
+    metrics.export()
+    metrics.close()
+    assert len((tmp_path/'tools.jsonl').read_text().splitlines())==2
+
+def test_to_string_lists_the_slowest_tools_first():
+    lines=make_metrics().to_string().splitlines()
+    assert lines[0].startswith('Click "Tool"')
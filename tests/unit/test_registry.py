@@ -0,0 +1,191 @@
+from src.tool.registry import Registry,compile_validator
+from src.tool.metrics import ToolMetrics
+from pydantic import BaseModel,ConfigDict,Field
+from typing import Literal
+from src.tool import Tool
+import src.tool.registry as registry_module
+import src.agent.web.tools as tools_module
+import asyncio
+import pytest
+
+class Delay(BaseModel):
+    seconds:float
+
+class Empty(BaseModel):
+    pass
+
+class Loose(BaseModel):
+    model_config=ConfigDict(extra='allow')
+
+class Flat(BaseModel):
+    index:int
+    mode:Literal['open','close']='open'
+    labels:list[str]=Field(default_factory=list)
+
+class Inner(BaseModel):
+    x:int
+
+class Nested(BaseModel):
+    inner:Inner
+
+def make_tools(log:list):
+    active={'Read':0,'peak':0}
+    @Tool('Read',params=Delay,mutates_page=False,parallel_safe=True,max_concurrency=2)
+    async def read(seconds:float,context=None):
+        '''Reads without touching the page.'''
+        active['Read']+=1
+        active['peak']=max(active['peak'],active['Read'])
+        log.append(('start','Read',seconds))
+        await asyncio.sleep(seconds)
+        log.append(('end','Read',seconds))
+        active['Read']-=1
+        return f'read {seconds}'
+    @Tool('Click',params=Delay)
+    async def click(seconds:float,context=None):
+        '''Changes the page.'''
+        log.append(('start','Click',seconds))
+        await asyncio.sleep(seconds)
+        log.append(('end','Click',seconds))
+        return f'click {seconds}'
+    return [read,click],active
+
+def test_execute_many_keeps_the_order_of_the_calls():
+    log=[]
+    tools,_=make_tools(log)
+    calls=[('Read',{'seconds':0.03}),('Read',{'seconds':0.01}),('Click',{'seconds':0.01}),('Read',{'seconds':0.01})]
+    results=asyncio.run(Registry(tools).async_execute_many(calls,context=None))
+    assert [result.content for result in results]==['read 0.03','read 0.01','click 0.01','read 0.01']
+    assert all(result.status=='success' for result in results)
+
+def test_execute_many_runs_parallel_safe_calls_together_up_to_max_concurrency():
+    log=[]
+    tools,active=make_tools(log)
+    calls=[('Read',{'seconds':0.02}) for _ in range(5)]
+    asyncio.run(Registry(tools).async_execute_many(calls))
+    assert active['peak']==2
+
+def test_execute_many_treats_page_changing_calls_as_barriers():
+    log=[]
+    tools,_=make_tools(log)
+    calls=[('Read',{'seconds':0.02}),('Click',{'seconds':0.01}),('Read',{'seconds':0.01})]
+    asyncio.run(Registry(tools).async_execute_many(calls))
+    click_start=log.index(('start','Click',0.01))
+    assert log.index(('end','Read',0.02))<click_start<log.index(('end','Click',0.01))<log.index(('start','Read',0.01))
+
+def test_wait_tool_delays_the_reads_that_follow_it(monkeypatch):
+    log=[]
+    async def sleep(seconds):
+        log.append(('start','Wait',seconds))
+        await asyncio.sleep(0.02)
+        log.append(('end','Wait',seconds))
+    monkeypatch.setattr(tools_module,'sleep',sleep)
+    @Tool('Scrape Tool',params=Empty,mutates_page=False,parallel_safe=True)
+    async def scrape(context=None):
+        '''Reads the page.'''
+        log.append(('start','Scrape'))
+        return ''
+    calls=[('Wait Tool',{'time':3}),('Scrape Tool',{})]
+    asyncio.run(Registry([tools_module.wait_tool,scrape]).async_execute_many(calls))
+    assert log==[('start','Wait',3),('end','Wait',3),('start','Scrape')]
+
+def test_execute_many_fails_only_the_invalid_calls():
+    log=[]
+    tools,_=make_tools(log)
+    calls=[('Read',{'seconds':'soon'}),('Missing',{}),('Read',{'seconds':0})]
+    results=asyncio.run(Registry(tools).async_execute_many(calls))
+    assert [result.status for result in results]==['error','error','success']
+    assert results[1].content.startswith("Error executing tool 'Missing'")
+
+def test_parallel_safe_is_dropped_for_page_changing_tools():
+    @Tool('Unsafe',params=Empty,parallel_safe=True)
+    async def unsafe(context=None):
+        '''Claims to be parallel safe but changes the page.'''
+        return ''
+    assert unsafe.parallel_safe is False
+
+@pytest.mark.parametrize('params,input',[
+    (Flat,{'index':'3','labels':['a']}),
+    (Flat,{'index':1,'mode':'close','extra':'ignored'}),
+    (Nested,{'inner':{'x':'5'}}),
+    (Empty,{'anything':1}),
+    (Loose,{'anything':1}),
+])
+def test_compile_validator_matches_model_dump(params,input):
+    assert compile_validator(params)(input)==params.model_validate(input).model_dump()
+
+def test_compile_validator_still_rejects_invalid_input():
+    with pytest.raises(ValueError):
+        compile_validator(Flat)({'index':'three'})
+
+def test_compile_validator_without_params_passes_the_input_through():
+    assert compile_validator(None)({'a':1})=={'a':1}
+
+def test_tools_prompt_is_cached_per_excluded_set():
+    log=[]
+    tools,_=make_tools(log)
+    registry=Registry(tools)
+    full=registry.tools_prompt()
+    assert registry.tools_prompt() is full
+    assert 'Tool Name: Click' not in registry.tools_prompt(excluded_tools=['Click'])
+
+def make_slow_tool(cleaned:list,timeout:float=None,swallow:bool=False):
+    async def cleanup(seconds:float,**kwargs):
+        cleaned.append(('cleanup',seconds))
+    @Tool('Slow',params=Delay,timeout=timeout,on_timeout=cleanup)
+    async def slow(seconds:float,context=None):
+        '''Sleeps.'''
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            cleaned.append(('cancelled',seconds))
+            if swallow:
+                await asyncio.sleep(60)
+            raise
+        return 'done'
+    return slow
+
+def test_tool_timeout_cancels_and_runs_the_cleanup_hook():
+    cleaned=[]
+    registry=Registry([make_slow_tool(cleaned,timeout=0.05)])
+    result=asyncio.run(registry.async_execute('Slow',{'seconds':5}))
+    assert result.status=='timeout'
+    assert cleaned==[('cancelled',5),('cleanup',5)]
+
+def test_call_timeout_is_the_tighter_deadline():
+    cleaned=[]
+    registry=Registry([make_slow_tool(cleaned,timeout=5)])
+    result=asyncio.run(registry.async_execute('Slow',{'seconds':1},timeout=0.05))
+    assert result.status=='timeout'
+    assert '0.05s' in result.content
+
+def test_registry_default_timeout_applies_to_tools_without_one():
+    cleaned=[]
+    registry=Registry([make_slow_tool(cleaned)],default_timeout=0.05)
+    assert asyncio.run(registry.async_execute('Slow',{'seconds':5})).status=='timeout'
+    assert asyncio.run(registry.async_execute('Slow',{'seconds':0})).status=='success'
+
+def test_a_tool_that_swallows_cancellation_does_not_block_the_caller(monkeypatch):
+    monkeypatch.setattr(registry_module,'CLEANUP_TIMEOUT',0.05)
+    cleaned=[]
+    registry=Registry([make_slow_tool(cleaned,timeout=0.05,swallow=True)])
+    async def run():
+        loop=asyncio.get_running_loop()
+        start=loop.time()
+        result=await registry.async_execute('Slow',{'seconds':5})
+        return result,loop.time()-start
+    result,elapsed=asyncio.run(run())
+    assert result.status=='timeout'
+    assert elapsed<1
+
+def test_metrics_record_calls_errors_and_timeouts():
+    cleaned=[]
+    metrics=ToolMetrics()
+    registry=Registry([make_slow_tool(cleaned,timeout=0.05)],metrics=metrics)
+    for input in ({'seconds':0},{'seconds':5},{'seconds':'later'}):
+        asyncio.run(registry.async_execute('Slow',input))
+    asyncio.run(registry.async_execute('Made Up',{}))
+    stats=metrics.tools['Slow']
+    assert stats.calls==3
+    assert stats.errors=={'TimeoutError':1,'ValidationError':1}
+    assert stats.duration_count==2
+    assert metrics.tools['Invalid Action'].errors=={'ValueError':1}
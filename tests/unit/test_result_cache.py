@@ -0,0 +1,76 @@
+from src.tool.registry import Registry
+from src.tool.cache import ResultCache
+from pydantic import BaseModel
+from src.tool import Tool
+import src.tool.cache as cache_module
+import asyncio
+
+class Query(BaseModel):
+    query:str
+
+def make_tool(calls:list,state:dict,persist:bool=True):
+    async def fingerprint(context=None,**kwargs):
+        return state['page']
+    @Tool('Search',params=Query,mutates_page=False,cache_ttl=60,cache_context=fingerprint,cache_persist=persist)
+    async def search(query:str,context=None):
+        '''Searches.'''
+        calls.append(query)
+        return f'results for {query} on {state["page"]}'
+    return search
+
+def test_identical_calls_hit_the_cache(tmp_path):
+    calls,state=[],{'page':'a'}
+    registry=Registry([make_tool(calls,state)],cache=ResultCache(tmp_path))
+    for _ in range(3):
+        result=asyncio.run(registry.async_execute('Search',{'query':'q'},context=object()))
+    assert calls==['q']
+    assert result.content=='results for q on a'
+    assert registry.cache.stats.hits=={'Search':2}
+    assert registry.cache.stats.misses=={'Search':1}
+
+def test_the_declared_context_is_part_of_the_key(tmp_path):
+    calls,state=[],{'page':'a'}
+    registry=Registry([make_tool(calls,state)],cache=ResultCache(tmp_path))
+    asyncio.run(registry.async_execute('Search',{'query':'q'}))
+    state['page']='b'
+    asyncio.run(registry.async_execute('Search',{'query':'q'}))
+    asyncio.run(registry.async_execute('Search',{'query':'other'}))
+    assert calls==['q','q','other']
+
+def test_entries_expire_after_the_ttl(tmp_path,monkeypatch):
+    calls,state=[],{'page':'a'}
+    registry=Registry([make_tool(calls,state)],cache=ResultCache(tmp_path))
+    asyncio.run(registry.async_execute('Search',{'query':'q'}))
+    now=cache_module.time()
+    monkeypatch.setattr(cache_module,'time',lambda:now+61)
+    asyncio.run(registry.async_execute('Search',{'query':'q'}))
+    assert calls==['q','q']
+
+def test_results_outlive_the_process_through_the_disk_store(tmp_path):
+    calls,state=[],{'page':'a'}
+    asyncio.run(Registry([make_tool(calls,state)],cache=ResultCache(tmp_path)).async_execute('Search',{'query':'q'}))
+    registry=Registry([make_tool(calls,state)],cache=ResultCache(tmp_path))
+    asyncio.run(registry.async_execute('Search',{'query':'q'}))
+    assert calls==['q']
+    assert registry.cache.stats.disk_hits==1
+
+def test_memory_only_results_never_reach_the_disk(tmp_path):
+    calls,state=[],{'page':'a'}
+    registry=Registry([make_tool(calls,state,persist=False)],cache=ResultCache(tmp_path))
+    asyncio.run(registry.async_execute('Search',{'query':'q'}))
+    asyncio.run(registry.async_execute('Search',{'query':'q'}))
+    assert calls==['q']
+    assert not list(tmp_path.glob('*/*.json'))
+
+def test_the_lru_evicts_the_least_recently_used_entry(tmp_path):
+    cache=ResultCache(tmp_path,max_entries=2)
+    for key in ('a','b','c'):
+        cache.set('Tool',key,key,ttl=60,persist=False)
+    assert list(cache.entries)==['b','c']
+
+def test_page_changing_tools_are_never_cacheable():
+    @Tool('Navigate',params=Query,cache_ttl=60)
+    async def navigate(query:str,context=None):
+        '''Navigates.'''
+        return ''
+    assert navigate.cache_ttl is None
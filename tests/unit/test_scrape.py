@@ -0,0 +1,60 @@
+from src.agent.web.scrape import find_main_content,chunk_markdown,html_to_markdown,clean,ScrapeCache,CHARS_PER_TOKEN
+from bs4 import BeautifulSoup
+
+PARAGRAPH='The committee met on Tuesday, reviewed the budget, and agreed to fund the new library wing in full.'
+
+PAGE=f'''
+<html><head><title>Library news</title><script>var tracking=1;</script></head>
+<body>
+<nav><a href="/">Home</a> <a href="/news">News</a> <a href="/about">About</a></nav>
+<div class="sidebar"><a href="/a">Popular story one</a> <a href="/b">Popular story two, with a long title</a></div>
+<div class="post-content" id="story">
+<h2>Budget approved</h2>
+{''.join(f'<p>{PARAGRAPH}</p>' for _ in range(5))}
+</div>
+<div class="comments"><p>Great news, finally, I have been waiting for this!</p></div>
+<footer>Copyright, all rights reserved, some more footer text here</footer>
+</body></html>
+'''
+
+def main_content(html:str):
+    soup=BeautifulSoup(html,'html.parser')
+    clean(soup)
+    return find_main_content(soup)
+
+def test_the_article_is_picked_over_the_page_chrome():
+    main=main_content(PAGE)
+    assert main.get('id')=='story'
+
+def test_a_single_main_landmark_wins():
+    html=f'<html><body><div class="content"><p>{PARAGRAPH}</p><p>{PARAGRAPH}</p></div><main>{"".join(f"<p>{PARAGRAPH}</p>" for _ in range(3))}</main></body></html>'
+    assert main_content(html).name=='main'
+
+def test_markdown_keeps_the_title_and_drops_scripts_and_navigation():
+    markdown=html_to_markdown(PAGE)
+    assert markdown.startswith('# Library news')
+    assert '## Budget approved' in markdown
+    assert 'tracking' not in markdown
+    assert 'Popular story' not in markdown
+    assert 'Copyright' not in markdown
+
+def test_chunks_stay_within_the_budget_and_split_on_blocks():
+    blocks=[f'Block {index} '+'x'*150 for index in range(20)]
+    chunks=chunk_markdown('\n\n'.join(blocks),token_budget=100)
+    assert all(len(chunk)<=100*CHARS_PER_TOKEN for chunk in chunks)
+    assert '\n\n'.join(chunks)=='\n\n'.join(blocks)
+    assert all(chunk.startswith('Block ') for chunk in chunks)
+
+def test_a_block_larger_than_the_budget_is_cut():
+    chunks=chunk_markdown('y'*1000,token_budget=100)
+    assert [len(chunk) for chunk in chunks]==[400,400,200]
+
+def test_empty_markdown_gives_one_empty_part():
+    assert chunk_markdown('')==['']
+
+def test_the_cache_keys_on_the_html():
+    cache=ScrapeCache()
+    first=cache.get_chunks('https://example.com',PAGE)
+    assert cache.get_chunks('https://example.com',PAGE) is first
+    cache.get_chunks('https://example.com',PAGE.replace('Budget approved','Budget rejected'))
+    assert (cache.hits,cache.misses)==(1,2)